@@ -1,4 +1,7 @@
 """Application factory for the teleprompter SaaS platform."""
+import os
+
+import click
 from flask import Flask
 from flask_login import current_user
 from flask_wtf.csrf import generate_csrf
@@ -24,11 +27,33 @@ def create_app(config_name: str | None = None) -> Flask:
 
 def register_extensions(app: Flask) -> None:
     """Initialize Flask extensions."""
+    from .querystats import init_query_stats
+    from .replicas import replica_binds
+
+    replica_urls = app.config.get("DATABASE_REPLICA_URLS") or []
+    if replica_urls:
+        app.config["SQLALCHEMY_BINDS"] = {**app.config.get("SQLALCHEMY_BINDS", {}), **replica_binds(replica_urls)}
     db.init_app(app)
+    init_query_stats(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
     login_manager.init_app(app)
-    socketio.init_app(app, cors_allowed_origins=app.config.get("CORS_ALLOWED_ORIGINS"))
+    socketio.init_app(
+        app,
+        async_mode=app.config.get("SOCKETIO_ASYNC_MODE"),
+        cors_allowed_origins=app.config.get("CORS_ALLOWED_ORIGINS"),
+        **_socketio_queue_options(app),
+    )
+
+    from .prompter.coalescing import control_updates
+    from .prompter.metrics import realtime_metrics
+    from .prompter.sessions import control_sessions
+    from .prompter.state import room_states
+
+    room_states.connect(_room_state_url(app), app.config.get("SOCKETIO_CHANNEL", "promptly"))
+    control_sessions.ttl = app.config.get("CONTROL_TOKEN_CACHE_TTL", 30.0)
+    control_updates.interval = app.config.get("CONTROL_COALESCE_INTERVAL", 0.05)
+    realtime_metrics.ack_every = app.config.get("CONTROL_ACK_SAMPLE_EVERY", 10)
 
     login_manager.login_view = "auth.login"
     login_manager.session_protection = "strong"
@@ -49,6 +74,61 @@ def register_extensions(app: Flask) -> None:
         return {"active_theme": normalized, "active_organization": active_org}
 
 
+def _room_state_url(app: Flask) -> str | None:
+    """Pick the shared store for room playback state, if workers need one.
+
+    Workers behind a message queue each handle some of a room's clients, so a
+    per-process store would hand joiners stale snapshots; refuse to start
+    unless the state is shared or ``memory://`` opts out explicitly.
+    """
+    url = app.config.get("ROOM_STATE_URL") or ""
+    queue = app.config.get("SOCKETIO_MESSAGE_QUEUE") or ""
+    if not url and queue.startswith(("redis://", "rediss://")):
+        url = queue
+    if url == "memory://":
+        return None
+    if queue and not url:
+        raise RuntimeError(
+            "SOCKETIO_MESSAGE_QUEUE runs several realtime workers, which must share room state. "
+            "Set ROOM_STATE_URL to a redis:// URL, or to memory:// to keep it per worker."
+        )
+    return url or None
+
+
+def _socketio_queue_options(app: Flask) -> dict[str, object]:
+    """Build the message queue settings that let several workers share rooms.
+
+    ``redis://``, ``kafka://``, ``zmq+tcp://`` and AMQP URLs are handed to
+    Flask-SocketIO as-is. ``filesystem://<folder>`` is a broker-less stand-in
+    for trying multi-worker fan-out on one machine.
+    """
+    url = app.config.get("SOCKETIO_MESSAGE_QUEUE")
+    if not url:
+        return {}
+
+    channel = app.config.get("SOCKETIO_CHANNEL", "promptly")
+    if not url.startswith("filesystem://"):
+        return {"message_queue": url, "channel": channel}
+
+    from socketio import KombuManager
+
+    folder = url[len("filesystem://"):] or os.path.join(app.instance_path, "socketio-queue")
+    control_folder = os.path.join(folder, "control")
+    os.makedirs(control_folder, exist_ok=True)
+    transport_options = {
+        "data_folder_in": folder,
+        "data_folder_out": folder,
+        "control_folder": control_folder,
+        "polling_interval": 0.05,
+    }
+    manager = KombuManager(
+        "filesystem://",
+        channel=channel,
+        connection_options={"transport_options": transport_options},
+    )
+    return {"client_manager": manager}
+
+
 def register_blueprints(app: Flask) -> None:
     """Register application blueprints."""
     from .auth.routes import auth_bp
@@ -58,6 +138,7 @@ def register_blueprints(app: Flask) -> None:
     from .organizations import organizations_bp
     from .settings.routes import settings_bp
     from .api.routes import api_bp
+    from .metrics.routes import metrics_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(dashboard_bp)
@@ -66,6 +147,7 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(organizations_bp)
     app.register_blueprint(settings_bp)
     app.register_blueprint(api_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp)
 
 
 def register_cli(app: Flask) -> None:
@@ -75,10 +157,55 @@ def register_cli(app: Flask) -> None:
         OrganizationInvite,
         OrgMembership,
         Script,
+        ScriptBlob,
         User,
         UserIntegration,
     )
 
+    @app.cli.command("reap-remote-sessions")
+    def reap_remote_sessions_command() -> None:
+        """End expired remote sessions and delete old ended ones."""
+        from .prompter.reaper import reap_remote_sessions
+
+        result = reap_remote_sessions()
+        click.echo(f"Ended {result.deactivated} expired sessions, deleted {result.deleted}.")
+
+    @app.cli.command("purge-invites")
+    def purge_invites_command() -> None:
+        """End expired invite codes and delete old ended ones."""
+        from .organizations.invites import purge_invites
+
+        result = purge_invites()
+        click.echo(f"Ended {result.deactivated} expired invites, deleted {result.deleted}.")
+
+    @app.cli.command("sync-replicas")
+    def sync_replicas_command() -> None:
+        """Copy a SQLite primary over its SQLite replicas for local testing."""
+        from .replicas import sync_sqlite_replicas
+
+        for path in sync_sqlite_replicas(db.engines):
+            click.echo(f"Synced replica {path}.")
+
+    @app.cli.command("reindex-scripts")
+    def reindex_scripts_command() -> None:
+        """Rebuild the full-text search index from every script."""
+        from .search import reindex_all
+
+        count = reindex_all()
+        click.echo(f"Indexed {count} scripts.")
+
+    @app.cli.command("backfill-scripts")
+    def backfill_scripts_command() -> None:
+        """Fill derived script fields on rows saved before those fields existed."""
+        filled = Script.backfill_derived()
+        click.echo(f"Backfilled {filled} scripts.")
+
+    @app.cli.command("purge-script-blobs")
+    def purge_script_blobs_command() -> None:
+        """Delete stored script bodies that no script references any more."""
+        deleted = ScriptBlob.purge_unreferenced(grace_seconds=app.config["SCRIPT_BLOB_PURGE_GRACE"])
+        click.echo(f"Deleted {deleted} unreferenced script blobs.")
+
     @app.shell_context_processor
     def shell_context() -> dict[str, object]:
         return {
@@ -94,6 +221,9 @@ def register_cli(app: Flask) -> None:
 
 def register_template_filters(app: Flask) -> None:
     """Register custom Jinja filters used in templates."""
-    from .markup import render_script
+    from .markup import format_duration, paragraph_cache, render_cache, render_cached
 
-    app.jinja_env.filters["teleprompter_markup"] = render_script
+    render_cache.resize(app.config.get("RENDER_CACHE_SIZE", 32))
+    paragraph_cache.resize(app.config.get("RENDER_CACHE_SIZE", 32))
+    app.jinja_env.filters["teleprompter_markup"] = render_cached
+    app.jinja_env.filters["duration"] = format_duration
@@ -5,28 +5,34 @@ from flask import abort, jsonify, request
 from flask_login import current_user, login_required
 
 from ..extensions import db
-from ..models import Script
+from ..models import ScriptRevision
+from ..permissions import load_owned_script
+from ..revisions import diff_revisions, revision_text, save_content
 from . import api_bp
 
-
-def _get_owned_script(script_id: int) -> Script:
-    script = Script.query.get_or_404(script_id)
-    if script.owner_id != current_user.id:
-        abort(403)
-    return script
+REVISION_PAGE_SIZE = 50
 
 
 @api_bp.get("/scripts/<int:script_id>")
 @login_required
 def get_script(script_id: int):
-    script = _get_owned_script(script_id)
+    script = load_owned_script(script_id, content=True)
     return jsonify(script.to_dict())
 
 
+@api_bp.get("/scripts/<int:script_id>/structure")
+@login_required
+def get_script_structure(script_id: int):
+    script = load_owned_script(script_id)
+    structure = script.structure()
+    structure["estimated_duration"] = script.estimated_duration
+    return jsonify(structure)
+
+
 @api_bp.patch("/scripts/<int:script_id>")
 @login_required
 def update_script(script_id: int):
-    script = _get_owned_script(script_id)
+    script = load_owned_script(script_id, content=True)
     payload = request.get_json(silent=True) or {}
 
     if "scroll_speed" in payload:
@@ -34,8 +40,50 @@ def update_script(script_id: int):
     if "theme" in payload:
         script.theme = payload["theme"]
     if "content" in payload:
-        script.content = payload["content"]
+        save_content(script, payload["content"], current_user.id)
 
     db.session.commit()
 
     return jsonify(script.to_dict())
+
+
+@api_bp.get("/scripts/<int:script_id>/revisions")
+@login_required
+def list_revisions(script_id: int):
+    script = load_owned_script(script_id)
+    limit = min(max(request.args.get("limit", REVISION_PAGE_SIZE, type=int), 1), REVISION_PAGE_SIZE)
+    query = script.revisions
+    before = request.args.get("before", type=int)
+    if before is not None:
+        query = query.filter(ScriptRevision.number < before)
+    revisions = query.limit(limit).all()
+    return jsonify(
+        {
+            "script_id": script.id,
+            "revisions": [revision.to_dict() for revision in revisions],
+            "next_before": revisions[-1].number if len(revisions) == limit else None,
+        }
+    )
+
+
+@api_bp.get("/scripts/<int:script_id>/revisions/<int:number>")
+@login_required
+def get_revision(script_id: int, number: int):
+    script = load_owned_script(script_id)
+    revision = script.revisions.filter(ScriptRevision.number == number).first()
+    if revision is None:
+        abort(404)
+    payload = revision.to_dict()
+    payload["content"] = revision_text(script.id, number)
+    return jsonify(payload)
+
+
+@api_bp.get("/scripts/<int:script_id>/revisions/<int:number>/diff")
+@login_required
+def diff_revision(script_id: int, number: int):
+    script = load_owned_script(script_id)
+    against = request.args.get("against", number - 1, type=int)
+    diff = diff_revisions(script.id, against, number)
+    if diff is None:
+        abort(404)
+    return jsonify({"script_id": script.id, "from": against, "to": number, "diff": diff})
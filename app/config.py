@@ -9,10 +9,31 @@ class BaseConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "change-me")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///teleprompter.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Comma-separated read replicas; reads on GET requests and Socket.IO events go
+    # to one of them. After a write, that browser reads from the primary for the
+    # sticky window so it sees its own changes.
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    DATABASE_REPLICA_STICKY_SECONDS = float(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5"))
+    # Statements slower than SQL_SLOW_QUERY_SECONDS are logged with their route (0
+    # disables), as are requests and Socket.IO events sending more than
+    # SQL_QUERY_WARN_COUNT statements (0 disables).
+    SQL_SLOW_QUERY_SECONDS = float(os.getenv("SQL_SLOW_QUERY_SECONDS", "0.25"))
+    SQL_QUERY_WARN_COUNT = int(os.getenv("SQL_QUERY_WARN_COUNT", "50"))
+    # Add X-Query-Count and Server-Timing headers with each response's totals.
+    SQL_QUERY_HEADERS = os.getenv("SQL_QUERY_HEADERS", "false").lower() == "true"
     SESSION_COOKIE_HTTPONLY = True
     REMEMBER_COOKIE_HTTPONLY = True
     WTF_CSRF_TIME_LIMIT = None
     CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "*")
+    # "threading" for local development; "gevent" serves thousands of idle sockets per process.
+    SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+    # Required when running more than one worker, e.g. redis://localhost:6379/0.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+    SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "promptly")
+    # Where room playback state lives. Several workers must share it, so with a
+    # message queue this defaults to the queue when that is Redis and must
+    # otherwise be a redis:// URL, or memory:// to knowingly keep it per worker.
+    ROOM_STATE_URL = os.getenv("ROOM_STATE_URL", "")
     GOOGLE_CLIENT_SECRETS_FILE = os.getenv(
         "GOOGLE_CLIENT_SECRETS_FILE", "instance/google_client_secrets.json"
     )
@@ -26,10 +47,48 @@ class BaseConfig:
     SCRIPT_POLL_INTERVAL = int(os.getenv("SCRIPT_POLL_INTERVAL", "30"))
     DEFAULT_SCROLL_SPEED = float(os.getenv("DEFAULT_SCROLL_SPEED", "1.0"))
     DEFAULT_THEME = os.getenv("DEFAULT_THEME", "light")
+    RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "32"))
+    PROMPTER_CHUNK_SIZE = int(os.getenv("PROMPTER_CHUNK_SIZE", "40"))
+    PROMPTER_MAX_CHUNK_SIZE = int(os.getenv("PROMPTER_MAX_CHUNK_SIZE", "200"))
+    DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "24"))
+    SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", "20"))
+    # Store a full snapshot every N revisions so rebuilding any version applies
+    # at most N - 1 deltas.
+    SCRIPT_SNAPSHOT_EVERY = int(os.getenv("SCRIPT_SNAPSHOT_EVERY", "20"))
+    # Unreferenced script blobs stored or reused more recently than this are kept
+    # by `flask purge-script-blobs`, so saves still in flight never lose theirs.
+    SCRIPT_BLOB_PURGE_GRACE = int(os.getenv("SCRIPT_BLOB_PURGE_GRACE", "3600"))
+    CONTROL_TOKEN_CACHE_TTL = float(os.getenv("CONTROL_TOKEN_CACHE_TTL", "30"))
+    # Remote sessions expire after REMOTE_SESSION_TTL seconds (0 disables expiry); the
+    # reaper ends them in batches and deletes ended rows after the retention period.
+    REMOTE_SESSION_TTL = int(os.getenv("REMOTE_SESSION_TTL", str(8 * 3600)))
+    REMOTE_SESSION_RETENTION = int(os.getenv("REMOTE_SESSION_RETENTION", str(7 * 86400)))
+    REMOTE_SESSION_REAP_INTERVAL = int(os.getenv("REMOTE_SESSION_REAP_INTERVAL", "300"))
+    # Run the background reaper in this process. Off by default with a message queue,
+    # where several workers would each reap; enable it on exactly one, or use cron.
+    REMOTE_SESSION_REAPER = (
+        os.getenv("REMOTE_SESSION_REAPER", "false" if SOCKETIO_MESSAGE_QUEUE else "true").lower() == "true"
+    )
+    REMOTE_SESSION_REAP_BATCH = int(os.getenv("REMOTE_SESSION_REAP_BATCH", "500"))
+    # New invite codes expire after ORGANIZATION_INVITE_TTL seconds (0 keeps them until
+    # revoked); `flask purge-invites` ends expired codes and deletes ended ones after
+    # the retention period.
+    ORGANIZATION_INVITE_TTL = int(os.getenv("ORGANIZATION_INVITE_TTL", "0"))
+    ORGANIZATION_INVITE_RETENTION = int(os.getenv("ORGANIZATION_INVITE_RETENTION", str(30 * 86400)))
+    ORGANIZATION_INVITE_PURGE_BATCH = int(os.getenv("ORGANIZATION_INVITE_PURGE_BATCH", "500"))
+    # Sample every Nth emitted update for ack-based delivery latency (0 disables).
+    CONTROL_ACK_SAMPLE_EVERY = int(os.getenv("CONTROL_ACK_SAMPLE_EVERY", "10"))
+    # /metrics requires "Authorization: Bearer <token>" and is disabled while unset.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    # Allow clients to negotiate the compact binary frame encoding at join.
+    CONTROL_BINARY_FRAMES = os.getenv("CONTROL_BINARY_FRAMES", "true").lower() == "true"
+    # Seconds between coalesced slider updates per room; 0 forwards every message.
+    CONTROL_COALESCE_INTERVAL = float(os.getenv("CONTROL_COALESCE_INTERVAL", "0.05"))
 
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
+    SQL_QUERY_HEADERS = os.getenv("SQL_QUERY_HEADERS", "true").lower() == "true"
     SESSION_COOKIE_SECURE = False
 
 
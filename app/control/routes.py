@@ -3,14 +3,20 @@ from __future__ import annotations
 
 from flask import abort, render_template
 
-from ..models import RemoteControlSession
+from ..prompter.sessions import find_valid_session
 from . import control_bp
 
 
 @control_bp.route("/control/<string:token>")
 def remote(token: str):
-    session = RemoteControlSession.query.filter_by(control_token=token, is_active=True).first()
-    if not session:
+    session = find_valid_session(token)
+    if session is None:
         abort(404)
 
-    return render_template("control/index.html", token=token, script=session.script)
+    script = session.script
+    return render_template(
+        "control/index.html",
+        token=token,
+        script=script,
+        cues=script.structure()["cues"],
+    )
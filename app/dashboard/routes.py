@@ -1,75 +1,103 @@
 """Routes for the main dashboard."""
 from __future__ import annotations
 
-from flask import abort, current_app, flash, redirect, render_template, url_for
+from datetime import datetime
+
+from flask import current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import aliased, joinedload
 
 from ..extensions import db
 from ..forms import ImportScriptForm, ScriptForm
-from ..models import RemoteControlSession, Script
+from ..models import OrgMembership, RemoteControlSession, Script
 from ..organizations.utils import get_active_organization
+from ..permissions import load_script
+from ..prompter.sessions import control_sessions
+from ..revisions import save_content
+from ..search import search_scripts
 from ..services.google_drive import GoogleDriveService
 from ..services.nextcloud import NextcloudService
 from . import dashboard_bp
 
 
-def _load_script(script_id: int, *, require_edit: bool = False) -> Script:
-    script = Script.query.get_or_404(script_id)
-
-    if not current_user.can_access_script(script):
-        abort(404)
-
-    active_org = get_active_organization()
-    if active_org:
-        if script.organization_id != active_org.id:
-            abort(404)
-    else:
-        if script.organization_id is not None:
-            abort(404)
-
-    if require_edit and script.owner_id != current_user.id:
-        if not script.organization_id or not current_user.is_org_admin(script.organization_id):
-            abort(403)
-
-    return script
-
-
 def _update_script_settings(script: Script, form: ScriptForm) -> None:
     script.title = form.title.data
-    script.content = form.content.data
+    save_content(script, form.content.data, current_user.id)
     script.scroll_speed = float(form.scroll_speed.data or current_app.config["DEFAULT_SCROLL_SPEED"])
     script.theme = form.theme.data
 
 
+def _parse_cursor(value: str | None) -> tuple[datetime, int] | None:
+    """Decode a ``<updated_at>_<id>`` keyset cursor; malformed ones restart the listing."""
+    if not value:
+        return None
+    timestamp, _, script_id = value.rpartition("_")
+    try:
+        return datetime.fromisoformat(timestamp), int(script_id)
+    except ValueError:
+        return None
+
+
 @dashboard_bp.route("/")
 @login_required
 def index():
     active_org = get_active_organization()
-    if active_org:
-        scripts = (
-            Script.query.filter_by(organization_id=active_org.id)
-            .order_by(Script.updated_at.desc())
-            .all()
+    page_size = current_app.config["DASHBOARD_PAGE_SIZE"]
+    membership = aliased(OrgMembership)
+    editable = or_(Script.owner_id == current_user.id, membership.role == "admin").label("editable")
+
+    query = (
+        select(Script, editable)
+        .outerjoin(
+            membership,
+            and_(membership.organization_id == Script.organization_id, membership.user_id == current_user.id),
         )
+        .order_by(Script.updated_at.desc(), Script.id.desc())
+        .limit(page_size + 1)
+    )
+    if active_org:
+        query = query.where(Script.organization_id == active_org.id)
     else:
-        scripts = (
-            Script.query.filter_by(owner_id=current_user.id, organization_id=None)
-            .order_by(Script.updated_at.desc())
-            .all()
+        query = query.where(Script.owner_id == current_user.id, Script.organization_id.is_(None))
+
+    cursor = _parse_cursor(request.args.get("before"))
+    if cursor:
+        updated_at, script_id = cursor
+        query = query.where(
+            or_(
+                Script.updated_at < updated_at,
+                and_(Script.updated_at == updated_at, Script.id < script_id),
+            )
         )
 
-    editable_script_ids = {
-        script.id
-        for script in scripts
-        if script.owner_id == current_user.id
-        or (script.organization_id and current_user.is_org_admin(script.organization_id))
-    }
+    rows = db.session.execute(query).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1].Script
+        next_cursor = f"{last.updated_at.isoformat()}_{last.id}"
 
     return render_template(
         "dashboard/index.html",
-        scripts=scripts,
+        scripts=[row.Script for row in rows],
         active_org=active_org,
-        editable_script_ids=editable_script_ids,
+        editable_script_ids={row.Script.id for row in rows if row.editable},
+        next_cursor=next_cursor,
+        is_first_page=cursor is None,
+    )
+
+
+@dashboard_bp.route("/scripts/search")
+@login_required
+def search():
+    query = request.args.get("q", "").strip()
+    results = search_scripts(query, limit=current_app.config["SEARCH_RESULTS_LIMIT"]) if query else []
+    return render_template(
+        "dashboard/search.html",
+        query=query,
+        results=results,
+        active_org=get_active_organization(),
     )
 
 
@@ -86,12 +114,12 @@ def create_script():
         active_org = get_active_organization()
         script = Script(
             title=form.title.data,
-            content=form.content.data,
             owner_id=current_user.id,
             organization_id=active_org.id if active_org else None,
             scroll_speed=float(form.scroll_speed.data or current_app.config["DEFAULT_SCROLL_SPEED"]),
             theme=form.theme.data,
         )
+        save_content(script, form.content.data, current_user.id)
         db.session.add(script)
         db.session.commit()
         flash("Script created.", "success")
@@ -103,7 +131,7 @@ def create_script():
 @dashboard_bp.route("/scripts/<int:script_id>/edit", methods=["GET", "POST"])
 @login_required
 def edit_script(script_id: int):
-    script = _load_script(script_id, require_edit=True)
+    script = load_script(script_id, require_edit=True, content=True)
     form = ScriptForm(obj=script)
     if form.validate_on_submit():
         _update_script_settings(script, form)
@@ -117,7 +145,7 @@ def edit_script(script_id: int):
 @dashboard_bp.route("/scripts/<int:script_id>/delete", methods=["POST"])
 @login_required
 def delete_script(script_id: int):
-    script = _load_script(script_id, require_edit=True)
+    script = load_script(script_id, require_edit=True)
     db.session.delete(script)
     db.session.commit()
     flash("Script removed.", "info")
@@ -143,7 +171,6 @@ def import_script():
             active_org = get_active_organization()
             script = Script(
                 title=imported.title,
-                content=imported.content,
                 owner_id=current_user.id,
                 organization_id=active_org.id if active_org else None,
                 source=provider,
@@ -151,6 +178,7 @@ def import_script():
                 scroll_speed=current_app.config["DEFAULT_SCROLL_SPEED"],
                 theme=current_app.config["DEFAULT_THEME"],
             )
+            save_content(script, imported.content, current_user.id)
             db.session.add(script)
             db.session.commit()
             flash("Script imported successfully.", "success")
@@ -165,14 +193,22 @@ def import_script():
 @dashboard_bp.route("/scripts/<int:script_id>/remote", methods=["POST"])
 @login_required
 def create_remote_session(script_id: int):
-    script = _load_script(script_id, require_edit=True)
-    if script.control_session and script.control_session.is_active:
+    script = load_script(
+        script_id, require_edit=True, options=(joinedload(Script.control_session),)
+    )
+    session = script.control_session
+    if session and session.is_valid():
         flash("Remote session already active.", "info")
         return redirect(url_for("dashboard.index"))
 
-    token = RemoteControlSession.issue_token()
-    session = RemoteControlSession(script_id=script.id, control_token=token)
-    db.session.add(session)
+    # One row per script: an ended or expired session is reissued in place.
+    if session is None:
+        session = RemoteControlSession(script_id=script.id)
+        db.session.add(session)
+    else:
+        control_sessions.invalidate(session.control_token)
+    session.restart(current_app.config["REMOTE_SESSION_TTL"])
     db.session.commit()
+    control_sessions.invalidate(session.control_token)
     flash("Remote control session created.", "success")
-    return redirect(url_for("control.remote", token=token))
+    return redirect(url_for("control.remote", token=session.control_token))
@@ -1,31 +1,332 @@
-"""Rendering helpers for teleprompter-friendly markup."""
+"""Rendering helpers for teleprompter-friendly markup.
+
+Scripts are parsed in a single pass into a small tree of paragraphs, each
+holding the inline nodes (bold, cues, pauses) found in it, and the tree is
+then streamed out as HTML. New inline tokens are added by registering another
+rule with the engine rather than by adding a substitution pass.
+"""
 from __future__ import annotations
 
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import hashlib
+from heapq import merge
 import re
+from threading import Lock
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
 
 from markupsafe import Markup, escape
 
 PARAGRAPH_BREAK = re.compile(r"\n\n+")
 BOLD = re.compile(r"\*\*(.+?)\*\*")
 CUE = re.compile(r"\[\[(.+?)\]\]")
-PAUSE = re.compile(r"\{\{\s*pause:(\d+(?:\.\d+)?)\s*\}\}")
+# Whitespace inside a pause may span single newlines but never a paragraph break.
+PAUSE = re.compile(r"\{\{(?:[^\S\n]|\n(?!\n))*pause:(\d+(?:\.\d+)?)(?:[^\S\n]|\n(?!\n))*\}\}")
+
+# Bump whenever the HTML produced by ``render_script`` changes so cached and
+# persisted renders from older versions are ignored.
+MARKUP_VERSION = 2
+
+# Comfortable read-aloud pace at scroll speed 1.0, used for run-time estimates.
+BASE_WORDS_PER_MINUTE = 150
+
+# Longest plain-text preview stored per script for listings.
+EXCERPT_LENGTH = 200
+
+
+# An inline token spanning ``source[start:end]``: (start, end, rule name, role,
+# value). Roles are "open" and "close" for paired delimiters and "atom" for
+# self-contained tokens. Plain tuples keep the parse cheap on very large scripts.
+Node = tuple[int, int, str, str, "str | None"]
+
+
+@dataclass(slots=True)
+class Paragraph:
+    start: int
+    end: int
+    nodes: list[Node] = field(default_factory=list)
+
+
+@dataclass(frozen=True, slots=True)
+class InlineRule:
+    """A token recognised inside paragraphs.
+
+    Paired rules wrap the pattern's first group with ``open_html``/``close_html``;
+    atom rules replace the whole match with ``render(value)``, where ``value`` is
+    the first group. Rule delimiters must not share characters with other rules,
+    and matches must not contain a paragraph break.
+    """
+
+    name: str
+    pattern: re.Pattern[str]
+    open_html: str = ""
+    close_html: str = ""
+    render: Callable[[str | None], str] | None = None
+
+    def scan(self, text: str, start: int, end: int) -> Iterator[Node]:
+        name = self.name
+        if self.render is None:
+            for match in self.pattern.finditer(text, start, end):
+                match_start, match_end = match.span()
+                inner_start, inner_end = match.span(1)
+                yield (match_start, inner_start, name, "open", None)
+                yield (inner_end, match_end, name, "close", None)
+        else:
+            for match in self.pattern.finditer(text, start, end):
+                yield (match.start(), match.end(), name, "atom", match.group(1))
+
+
+def _render_pause(seconds: str | None) -> str:
+    return f"<span class=\"pause\" data-duration=\"{seconds}\">⏸ {seconds}s</span>"
+
+
+DEFAULT_RULES: tuple[InlineRule, ...] = (
+    InlineRule("bold", BOLD, open_html="<strong>", close_html="</strong>"),
+    InlineRule("cue", CUE, open_html="<span class=\"cue\">", close_html="</span>"),
+    InlineRule("pause", PAUSE, render=_render_pause),
+)
+
+
+class MarkupEngine:
+    """Parse teleprompter markup into paragraphs and emit HTML from them."""
+
+    def __init__(self, rules: Iterable[InlineRule] = DEFAULT_RULES) -> None:
+        self.rules = tuple(rules)
+
+    def parse(self, text: str) -> Iterator[Paragraph]:
+        """Yield paragraphs with their inline nodes; offsets index into ``text``."""
+        end = len(text.rstrip())
+        start = len(text) - len(text.lstrip()) if end else 0
+
+        nodes = merge(*(rule.scan(text, start, end) for rule in self.rules))
+        pending = next(nodes, None)
+
+        breaks = PARAGRAPH_BREAK.finditer(text, start, end)
+        block_start = start
+        while block_start < end:
+            separator = next(breaks, None)
+            block_end = separator.start() if separator else end
+            paragraph = Paragraph(block_start, block_end)
+            while pending is not None and pending[0] < block_end:
+                paragraph.nodes.append(pending)
+                pending = next(nodes, None)
+            yield paragraph
+            if separator is None:
+                break
+            block_start = separator.end()
+
+    def iter_html(self, text: str) -> Iterator[str]:
+        """Stream the HTML for ``text`` one paragraph at a time."""
+        # Rule delimiters never contain characters touched by escaping, so the
+        # escaped source parses into exactly the same tree and can be sliced as-is.
+        source = str(escape(text))
+        markup = {}
+        for rule in self.rules:
+            markup[rule.name, "open"] = rule.open_html
+            markup[rule.name, "close"] = rule.close_html
+        renderers = {rule.name: rule.render for rule in self.rules}
+
+        separator = ""
+        for paragraph in self.parse(source):
+            parts = [separator, "<p>"]
+            position = paragraph.start
+            for start, end, name, role, value in paragraph.nodes:
+                parts.append(source[position:start])
+                if role == "atom":
+                    parts.append(renderers[name](value))
+                else:
+                    parts.append(markup[name, role])
+                position = end
+            parts.append(source[position:paragraph.end])
+            parts.append("</p>")
+            separator = "\n"
+            yield "".join(parts)
+
+    def render(self, text: str) -> Markup:
+        return Markup("".join(self.iter_html(text)))
+
+
+@dataclass(slots=True)
+class ScriptStructure:
+    """Precomputed layout facts for a script, with offsets into the raw content.
+
+    ``paragraphs`` holds ``[start, end, words, pause_seconds]`` per paragraph and
+    ``cues`` holds ``[paragraph_index, offset, label]``. Words inside cues and
+    pauses are not counted since they are never read aloud.
+    """
+
+    paragraphs: list[list[int | float]] = field(default_factory=list)
+    cues: list[list[int | str]] = field(default_factory=list)
+    word_count: int = 0
+    pause_seconds: float = 0.0
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "version": MARKUP_VERSION,
+            "paragraphs": self.paragraphs,
+            "cues": self.cues,
+            "word_count": self.word_count,
+            "pause_seconds": self.pause_seconds,
+        }
+
+
+def build_structure(text: str) -> ScriptStructure:
+    """Index paragraphs, word counts, cues and pauses of ``text`` in one parse."""
+    structure = ScriptStructure()
+    for index, paragraph in enumerate(engine.parse(text)):
+        words = 0
+        pause_seconds = 0.0
+        position = paragraph.start
+        cue: tuple[int, int] | None = None
+        for start, end, name, role, value in paragraph.nodes:
+            if cue is None:
+                words += len(text[position:start].split())
+            if name == "cue" and role == "open":
+                cue = (start, end)
+            elif name == "cue" and role == "close" and cue is not None:
+                structure.cues.append([index, cue[0], text[cue[1]:start].strip()])
+                cue = None
+            elif name == "pause":
+                pause_seconds += float(value or 0)
+            position = end
+        words += len(text[position:paragraph.end].split())
+
+        structure.paragraphs.append([paragraph.start, paragraph.end, words, pause_seconds])
+        structure.word_count += words
+        structure.pause_seconds += pause_seconds
+    return structure
+
+
+def _plain_paragraphs(text: str) -> Iterator[str]:
+    for paragraph in engine.parse(text):
+        parts: list[str] = []
+        position = paragraph.start
+        in_cue = False
+        for start, end, name, role, _value in paragraph.nodes:
+            if not in_cue:
+                parts.append(text[position:start])
+            if name == "cue":
+                in_cue = role == "open"
+            position = end
+        if not in_cue:
+            parts.append(text[position:paragraph.end])
+        yield "".join(parts)
+
+
+def plain_text(text: str) -> str:
+    """Return the words read aloud: bold unwrapped, cues and pauses dropped."""
+    return "\n\n".join(_plain_paragraphs(text))
+
+
+def build_excerpt(text: str, limit: int = EXCERPT_LENGTH) -> str:
+    """Return the opening words of ``text`` as plain text, without cues or pauses.
+
+    Only a prefix of the script is parsed, so the cost does not grow with its size.
+    """
+    parts: list[str] = []
+    length = 0
+    for paragraph in _plain_paragraphs(text[: limit * 4]):
+        parts.append(paragraph)
+        length += len(paragraph)
+        if length >= limit:
+            break
+
+    excerpt = " ".join(" ".join(parts).split())
+    if len(excerpt) <= limit:
+        return excerpt
+    return excerpt[:limit].rsplit(" ", 1)[0].rstrip(".,;:!?") + "…"
+
+
+def estimate_duration(word_count: int, pause_seconds: float, scroll_speed: float) -> float:
+    """Estimate the read time in seconds for a script at a given scroll speed."""
+    words_per_minute = BASE_WORDS_PER_MINUTE * max(scroll_speed or 1.0, 0.1)
+    return word_count * 60.0 / words_per_minute + pause_seconds
+
+
+def format_duration(seconds: float | None) -> str:
+    """Format a duration in seconds as ``m:ss`` or ``h:mm:ss``."""
+    if seconds is None:
+        return ""
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def split_paragraphs(html: str) -> list[Markup]:
+    """Split rendered script HTML back into its ``<p>`` blocks.
+
+    Paragraph text is escaped and no rule emits ``</p>``, so the separator
+    written between paragraphs cannot occur anywhere else in the output.
+    """
+    if not html:
+        return []
+    return [Markup(f"<p>{block}</p>") for block in html[3:-4].split("</p>\n<p>")]
+
+
+engine = MarkupEngine()
 
 
 def render_script(text: str) -> Markup:
     """Convert lightweight markup to safe HTML for the teleprompter."""
-    paragraphs = []
-    for block in PARAGRAPH_BREAK.split(text.strip()):
-        if not block:
-            continue
-        safe = escape(block)
-        safe = BOLD.sub(r"<strong>\1</strong>", safe)
-        safe = CUE.sub(r"<span class=\"cue\">\1</span>", safe)
-
-        def render_pause(match: re.Match[str]) -> str:
-            seconds = match.group(1)
-            return f"<span class=\"pause\" data-duration=\"{seconds}\">⏸ {seconds}s</span>"
-
-        safe = PAUSE.sub(render_pause, safe)
-        paragraphs.append(f"<p>{safe}</p>")
-
-    return Markup("\n".join(paragraphs))
+    return engine.render(text)
+
+
+def content_digest(text: str) -> str:
+    """Return the hex SHA-256 digest used to key rendered script output."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+T = TypeVar("T")
+
+
+class RenderCache(Generic[T]):
+    """Thread-safe LRU of rendered scripts keyed by (content digest, markup version)."""
+
+    def __init__(self, maxsize: int = 32) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, int], T] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, digest: str) -> T | None:
+        key = (digest, MARKUP_VERSION)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def set(self, digest: str, html: T) -> None:
+        if self.maxsize <= 0:
+            return
+        key = (digest, MARKUP_VERSION)
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+render_cache: RenderCache[Markup] = RenderCache()
+paragraph_cache: RenderCache[list[Markup]] = RenderCache()
+
+
+def render_cached(text: str, *, digest: str | None = None) -> Markup:
+    """Render ``text`` through the in-process cache, rendering only on a miss."""
+    digest = digest or content_digest(text)
+    html = render_cache.get(digest)
+    if html is None:
+        html = render_script(text)
+        render_cache.set(digest, html)
+    return html
@@ -0,0 +1,7 @@
+"""Metrics blueprint for scraping runtime counters."""
+from flask import Blueprint
+
+
+metrics_bp = Blueprint("metrics", __name__)
+
+from . import routes  # noqa: E402
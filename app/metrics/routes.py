@@ -0,0 +1,58 @@
+"""Prometheus-style metrics endpoint."""
+from __future__ import annotations
+
+import hmac
+
+from flask import Response, abort, current_app, request
+
+from ..prompter.coalescing import control_updates
+from ..prompter.metrics import realtime_metrics
+from ..prompter.sessions import connections, control_sessions
+from ..prompter.state import room_states
+from . import metrics_bp
+
+
+def _check_token() -> None:
+    # Room labels are script ids, so without a token the endpoint stays closed.
+    expected = current_app.config.get("METRICS_TOKEN")
+    if not expected:
+        abort(403)
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied, expected):
+        abort(403)
+
+
+@metrics_bp.get("/metrics")
+def scrape():
+    _check_token()
+    cache = control_sessions.stats()
+    coalescer = control_updates.stats()
+    body = realtime_metrics.render(
+        {
+            "promptly_control_token_cache_hits_total": (
+                "counter", "Control token lookups served from cache.", cache["hits"]
+            ),
+            "promptly_control_token_cache_misses_total": (
+                "counter", "Control token lookups that hit the database.", cache["misses"]
+            ),
+            "promptly_control_token_cache_size": (
+                "gauge", "Control tokens currently cached.", cache["size"]
+            ),
+            "promptly_control_updates_received_total": (
+                "counter", "Control updates submitted for fan-out.", coalescer["received"]
+            ),
+            "promptly_control_updates_emitted_total": (
+                "counter", "Updates emitted after coalescing.", coalescer["emitted"]
+            ),
+            "promptly_control_updates_pending": (
+                "gauge", "Coalesced updates waiting for the next tick.", coalescer["pending"]
+            ),
+            "promptly_control_bound_connections": (
+                "gauge", "Connections bound to a control token.", len(connections)
+            ),
+            "promptly_control_rooms": (
+                "gauge", "Rooms with playback state.", len(room_states)
+            ),
+        }
+    )
+    return Response(body, mimetype="text/plain; version=0.0.4")
@@ -1,18 +1,41 @@
 """Database models for the teleprompter application."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import re
 from secrets import token_urlsafe
+import zlib
 
 from flask_login import UserMixin
+from markupsafe import Markup
+from sqlalchemy import ColumnElement, and_, delete, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm.attributes import flag_modified
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from .extensions import db, login_manager
+from .markup import (
+    MARKUP_VERSION,
+    build_excerpt,
+    build_structure,
+    content_digest,
+    estimate_duration,
+    paragraph_cache,
+    render_cache,
+    render_cached,
+    render_script,
+    split_paragraphs,
+)
 
 _slugify_pattern = re.compile(r"[^a-z0-9]+")
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class MissingScriptBlob(RuntimeError):
+    """A script's ``content_hash`` names a blob that is not stored."""
 
 
 def _slugify(value: str) -> str:
@@ -43,27 +66,25 @@ class User(UserMixin, db.Model):
     nextcloud_app_password: Mapped[str | None] = mapped_column(db.String(255))
 
     scripts: Mapped[list[Script]] = relationship("Script", back_populates="owner", lazy="dynamic")
+    # Collections load on first access only; the common membership checks use
+    # ``membership_roles`` instead of pulling every row on each request.
     integrations: Mapped[list["UserIntegration"]] = relationship(
         "UserIntegration",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     memberships: Mapped[list["OrgMembership"]] = relationship(
         "OrgMembership",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     organizations_created: Mapped[list["Organization"]] = relationship(
         "Organization",
         back_populates="created_by",
-        lazy="selectin",
     )
     invites_created: Mapped[list["OrganizationInvite"]] = relationship(
         "OrganizationInvite",
         back_populates="created_by",
-        lazy="selectin",
     )
 
     def set_password(self, password: str) -> None:
@@ -89,29 +110,48 @@ class User(UserMixin, db.Model):
                 return integration
         return None
 
+    @property
+    def membership_roles(self) -> dict[int, str]:
+        """Map of organization id to role, fetched once per loaded user."""
+        if "memberships" in self.__dict__:
+            return {membership.organization_id: membership.role for membership in self.memberships}
+        roles = self.__dict__.get("_membership_roles")
+        if roles is None:
+            rows = db.session.execute(
+                select(OrgMembership.organization_id, OrgMembership.role).where(
+                    OrgMembership.user_id == self.id
+                )
+            )
+            roles = self.__dict__["_membership_roles"] = {org_id: role for org_id, role in rows}
+        return roles
+
+    def forget_memberships(self) -> None:
+        """Drop the cached role summary after memberships change."""
+        self.__dict__.pop("_membership_roles", None)
+
     def get_membership(self, organization: "Organization | int | None") -> "OrgMembership | None":
         if organization is None:
             return None
         organization_id = organization if isinstance(organization, int) else organization.id
-        for membership in self.memberships:
-            if membership.organization_id == organization_id:
-                return membership
-        return None
+        if "memberships" in self.__dict__:
+            for membership in self.memberships:
+                if membership.organization_id == organization_id:
+                    return membership
+            return None
+        if organization_id not in self.membership_roles:
+            return None
+        return db.session.execute(
+            select(OrgMembership).filter_by(organization_id=organization_id, user_id=self.id)
+        ).scalar_one_or_none()
 
     def is_org_admin(self, organization: "Organization | int | None") -> bool:
-        membership = self.get_membership(organization)
-        return bool(membership and membership.role == "admin")
+        if organization is None:
+            return False
+        organization_id = organization if isinstance(organization, int) else organization.id
+        return self.membership_roles.get(organization_id) == "admin"
 
     def organization_ids(self) -> set[int]:
-        return {membership.organization_id for membership in self.memberships}
-
-    def can_access_script(self, script: "Script") -> bool:
-        if script.owner_id == self.id:
-            return True
-        if script.organization_id and script.organization_id in self.organization_ids():
-            membership = self.get_membership(script.organization_id)
-            return membership is not None
-        return False
+        return set(self.membership_roles)
 
 
 class Organization(db.Model):
@@ -131,13 +171,11 @@ class Organization(db.Model):
         "OrgMembership",
         back_populates="organization",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     invites: Mapped[list["OrganizationInvite"]] = relationship(
         "OrganizationInvite",
         back_populates="organization",
         cascade="all, delete-orphan",
-        lazy="selectin",
     )
     scripts: Mapped[list["Script"]] = relationship("Script", back_populates="organization")
 
@@ -179,10 +217,20 @@ class OrganizationInvite(db.Model):
     organization: Mapped[Organization] = relationship("Organization", back_populates="invites")
     created_by: Mapped[User | None] = relationship("User", back_populates="invites_created")
 
+    __table_args__ = (
+        db.Index("ix_organization_invites_org_active_expires", "organization_id", "is_active", "expires_at"),
+    )
+
     @staticmethod
     def issue_code() -> str:
         return token_urlsafe(8)
 
+    @classmethod
+    def valid_clause(cls, now: datetime | None = None) -> ColumnElement[bool]:
+        """SQL counterpart of :meth:`is_valid`."""
+        now = now or datetime.utcnow()
+        return and_(cls.is_active.is_(True), or_(cls.expires_at.is_(None), cls.expires_at > now))
+
     def is_valid(self) -> bool:
         if not self.is_active:
             return False
@@ -191,22 +239,107 @@ class OrganizationInvite(db.Model):
         return True
 
 
+class ScriptBlob(db.Model):
+    """A zlib-compressed script body addressed by the SHA-256 of its text.
+
+    Blobs are immutable and shared by every script with identical content, so
+    duplicated imports are stored once.
+    """
+
+    __tablename__ = "script_blobs"
+
+    digest: Mapped[str] = mapped_column(db.String(64), primary_key=True)
+    data: Mapped[bytes] = mapped_column(db.LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(db.Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def for_content(cls, text: str, digest: str | None = None) -> "ScriptBlob":
+        """Return the stored blob for ``text``, inserting it if needed.
+
+        The upsert is atomic, so concurrent saves of the same text never collide
+        on the digest. Reusing a blob also refreshes ``created_at``: the row
+        stays locked until this transaction ends and falls inside the purge's
+        grace period afterwards, so a concurrent purge cannot remove it.
+        """
+        digest = digest or content_digest(text)
+        encoded = text.encode("utf-8")
+        now = datetime.utcnow()
+        values = {"digest": digest, "data": zlib.compress(encoded), "size": len(encoded), "created_at": now}
+        dialect = db.session.get_bind(mapper=cls.__mapper__).dialect.name
+        with db.session.no_autoflush:
+            if dialect in _UPSERT_INSERTS:
+                statement = _UPSERT_INSERTS[dialect](cls).values(**values)
+                db.session.execute(
+                    statement.on_conflict_do_update(index_elements=[cls.digest], set_={"created_at": now})
+                )
+            else:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(cls(**values))
+                except IntegrityError:
+                    db.session.execute(update(cls).where(cls.digest == digest).values(created_at=now))
+            blob = db.session.get(cls, digest)
+        blob.__dict__["_text"] = text
+        return blob
+
+    @classmethod
+    def purge_unreferenced(cls, batch_size: int = 500, grace_seconds: int = 3600) -> int:
+        """Delete blobs no script or snapshot points at, in batches; returns how many went.
+
+        Each batch is a single ``DELETE`` that re-checks the references, and
+        blobs stored or reused within ``grace_seconds`` are kept for writers
+        that have not committed yet.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        unreferenced = and_(
+            cls.created_at < cutoff,
+            ~select(Script.id).where(Script.content_hash == cls.digest).exists(),
+            ~select(ScriptRevision.id).where(ScriptRevision.blob_digest == cls.digest).exists(),
+        )
+        deleted = 0
+        while True:
+            batch = select(cls.digest).where(unreferenced).limit(batch_size).scalar_subquery()
+            result = db.session.execute(
+                delete(cls).where(cls.digest.in_(batch), unreferenced),
+                execution_options={"synchronize_session": False},
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    def text(self) -> str:
+        cached = self.__dict__.get("_text")
+        if cached is None:
+            cached = self.__dict__["_text"] = zlib.decompress(self.data).decode("utf-8")
+        return cached
+
+
 class Script(db.Model):
     __tablename__ = "scripts"
 
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(db.String(255), nullable=False)
-    content: Mapped[str] = mapped_column(db.Text, nullable=False)
-    owner_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False, index=True)
+    owner_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
     organization_id: Mapped[int | None] = mapped_column(
         db.ForeignKey("organizations.id", ondelete="SET NULL"),
-        index=True,
     )
     source: Mapped[str | None] = mapped_column(db.String(50))
     source_identifier: Mapped[str | None] = mapped_column(db.String(255))
     scroll_speed: Mapped[float] = mapped_column(db.Float, default=1.0, nullable=False)
     theme: Mapped[str] = mapped_column(db.String(50), default="light", nullable=False)
     is_shared: Mapped[bool] = mapped_column(default=False)
+    content_hash: Mapped[str] = mapped_column(
+        db.ForeignKey("script_blobs.digest"), nullable=False, index=True
+    )
+    rendered_html: Mapped[str | None] = mapped_column(db.Text, deferred=True)
+    rendered_version: Mapped[int | None] = mapped_column(db.Integer)
+    structure_json: Mapped[str | None] = mapped_column(db.Text, deferred=True)
+    paragraph_count: Mapped[int | None] = mapped_column(db.Integer)
+    word_count: Mapped[int | None] = mapped_column(db.Integer)
+    pause_seconds: Mapped[float | None] = mapped_column(db.Float)
+    excerpt: Mapped[str | None] = mapped_column(db.String(255))
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
@@ -214,10 +347,120 @@ class Script(db.Model):
 
     owner: Mapped[User] = relationship("User", back_populates="scripts")
     organization: Mapped[Organization | None] = relationship("Organization", back_populates="scripts")
+    blob: Mapped[ScriptBlob] = relationship("ScriptBlob")
+    revisions: Mapped[list["ScriptRevision"]] = relationship(
+        "ScriptRevision",
+        back_populates="script",
+        cascade="all, delete-orphan",
+        lazy="dynamic",
+        order_by="ScriptRevision.number.desc()",
+    )
     control_session: Mapped[RemoteControlSession | None] = relationship(
         "RemoteControlSession", back_populates="script", uselist=False
     )
 
+    # Dashboard listings walk these newest first; they also cover the foreign keys.
+    __table_args__ = (
+        db.Index("ix_scripts_org_updated", "organization_id", "updated_at"),
+        db.Index("ix_scripts_owner_org_updated", "owner_id", "organization_id", "updated_at"),
+    )
+
+    @property
+    def content(self) -> str:
+        """The script text, read from its blob on first access."""
+        if self.blob is None:
+            if self.content_hash is None:
+                return ""
+            raise MissingScriptBlob(f"Script {self.id} points at missing blob {self.content_hash}.")
+        return self.blob.text()
+
+    @content.setter
+    def content(self, value: str) -> None:
+        """Store ``value`` as a shared blob and refresh the derived fields."""
+        digest = content_digest(value)
+        if digest == self.content_hash and self.rendered_version == MARKUP_VERSION:
+            return
+
+        if digest != self.content_hash:
+            self.blob = ScriptBlob.for_content(value, digest)
+        html = render_cached(value, digest=digest)
+        self.content_hash = digest
+        self.rendered_html = str(html)
+        self.rendered_version = MARKUP_VERSION
+        self._store_structure(value)
+        self.excerpt = build_excerpt(value)
+
+    def _store_structure(self, content: str) -> None:
+        structure = build_structure(content).to_dict()
+        self.structure_json = json.dumps(structure, separators=(",", ":"))
+        self.paragraph_count = len(structure["paragraphs"])
+        self.word_count = structure["word_count"]
+        self.pause_seconds = structure["pause_seconds"]
+
+    @classmethod
+    def backfill_derived(cls, batch_size: int = 200) -> int:
+        """Fill derived columns on rows saved before they existed; returns how many changed.
+
+        Works in id order, a batch per transaction, and leaves ``updated_at``
+        alone so listings keep their order.
+        """
+        filled = 0
+        last_id = 0
+        while True:
+            scripts = db.session.scalars(
+                select(cls)
+                .where(cls.id > last_id, or_(cls.word_count.is_(None), cls.excerpt.is_(None)))
+                .order_by(cls.id)
+                .limit(batch_size)
+            ).all()
+            if not scripts:
+                return filled
+            for script in scripts:
+                content = script.content
+                script._store_structure(content)
+                script.excerpt = build_excerpt(content)
+                flag_modified(script, "updated_at")
+            db.session.commit()
+            filled += len(scripts)
+            last_id = scripts[-1].id
+            db.session.expunge_all()
+
+    def structure(self) -> dict[str, object]:
+        """Return the stored structure index, building it for rows that predate it."""
+        if self.structure_json and self.rendered_version == MARKUP_VERSION:
+            return json.loads(self.structure_json)
+        return build_structure(self.content).to_dict()
+
+    @property
+    def estimated_duration(self) -> float | None:
+        """Estimated read time in seconds at the script's current scroll speed."""
+        if self.word_count is None:
+            return None
+        return estimate_duration(self.word_count, self.pause_seconds or 0.0, self.scroll_speed)
+
+    def rendered_content(self) -> Markup:
+        """Return the teleprompter HTML, preferring the LRU over the persisted render."""
+        digest = self.content_hash or content_digest(self.content)
+        html = render_cache.get(digest)
+        if html is not None:
+            return html
+
+        if self.content_hash and self.rendered_version == MARKUP_VERSION and self.rendered_html is not None:
+            html = Markup(self.rendered_html)
+        else:
+            html = render_script(self.content)
+        render_cache.set(digest, html)
+        return html
+
+    def rendered_paragraphs(self) -> list[Markup]:
+        """Return the rendered script as a list of ``<p>`` blocks for paged display."""
+        digest = self.content_hash or content_digest(self.content)
+        blocks = paragraph_cache.get(digest)
+        if blocks is None:
+            blocks = split_paragraphs(self.rendered_content())
+            paragraph_cache.set(digest, blocks)
+        return blocks
+
     def to_dict(self) -> dict[str, object]:
         return {
             "id": self.id,
@@ -230,10 +473,56 @@ class Script(db.Model):
             "scroll_speed": self.scroll_speed,
             "theme": self.theme,
             "is_shared": self.is_shared,
+            "paragraph_count": self.paragraph_count,
+            "word_count": self.word_count,
+            "pause_seconds": self.pause_seconds,
+            "estimated_duration": self.estimated_duration,
+            "excerpt": self.excerpt,
             "updated_at": self.updated_at.isoformat(),
         }
 
 
+class ScriptRevision(db.Model):
+    """One saved version of a script's content.
+
+    Snapshots point at the full body in ``script_blobs``; every other revision
+    stores a compressed line delta against the revision before it. ``base_number``
+    is the snapshot a delta chain starts from.
+    """
+
+    __tablename__ = "script_revisions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    script_id: Mapped[int] = mapped_column(db.ForeignKey("scripts.id", ondelete="CASCADE"), nullable=False)
+    number: Mapped[int] = mapped_column(db.Integer, nullable=False)
+    base_number: Mapped[int] = mapped_column(db.Integer, nullable=False)
+    author_id: Mapped[int | None] = mapped_column(db.ForeignKey("users.id", ondelete="SET NULL"))
+    content_hash: Mapped[str] = mapped_column(db.String(64), nullable=False)
+    size: Mapped[int] = mapped_column(db.Integer, nullable=False)
+    blob_digest: Mapped[str | None] = mapped_column(db.ForeignKey("script_blobs.digest"), index=True)
+    delta: Mapped[bytes | None] = mapped_column(db.LargeBinary, deferred=True)
+    created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+
+    script: Mapped[Script] = relationship("Script", back_populates="revisions")
+    author: Mapped[User | None] = relationship("User")
+
+    __table_args__ = (db.UniqueConstraint("script_id", "number", name="uq_script_revision_number"),)
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self.blob_digest is not None
+
+    def to_dict(self) -> dict[str, object]:
+        return {
+            "number": self.number,
+            "author_id": self.author_id,
+            "content_hash": self.content_hash,
+            "size": self.size,
+            "snapshot": self.is_snapshot,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
 class RemoteControlSession(db.Model):
     __tablename__ = "remote_control_sessions"
 
@@ -242,13 +531,34 @@ class RemoteControlSession(db.Model):
     control_token: Mapped[str] = mapped_column(db.String(255), unique=True, nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, nullable=False)
+    expires_at: Mapped[datetime | None] = mapped_column(db.DateTime())
 
     script: Mapped[Script] = relationship("Script", back_populates="control_session")
 
+    __table_args__ = (
+        db.Index("ix_remote_control_sessions_token_active", "control_token", "is_active"),
+        db.Index("ix_remote_control_sessions_active_expires", "is_active", "expires_at"),
+    )
+
     @staticmethod
     def issue_token() -> str:
         return token_urlsafe(16)
 
+    def is_valid(self) -> bool:
+        if not self.is_active:
+            return False
+        if self.expires_at and datetime.utcnow() > self.expires_at:
+            return False
+        return True
+
+    def restart(self, ttl: int) -> None:
+        """Reuse this row for a fresh session with a new token and expiry."""
+        now = datetime.utcnow()
+        self.control_token = self.issue_token()
+        self.is_active = True
+        self.created_at = now
+        self.expires_at = now + timedelta(seconds=ttl) if ttl > 0 else None
+
 
 class UserIntegration(db.Model):
     __tablename__ = "user_integrations"
@@ -0,0 +1,72 @@
+"""Expiry and clean-up of organization invite codes in batched statements."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+
+from ..extensions import db
+from ..models import OrganizationInvite
+
+
+@dataclass(slots=True)
+class InvitePurgeResult:
+    deactivated: int = 0
+    deleted: int = 0
+
+
+def purge_invites(
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    retention: int | None = None,
+) -> InvitePurgeResult:
+    """Deactivate expired invites, then delete ended ones older than the retention period.
+
+    Ended invites age from ``expires_at``, which revoking sets to the revocation
+    time; invites revoked before that was recorded age from their creation.
+    Each batch is its own transaction.
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = batch_size or config["ORGANIZATION_INVITE_PURGE_BATCH"]
+    retention = config["ORGANIZATION_INVITE_RETENTION"] if retention is None else retention
+    model = OrganizationInvite
+    result = InvitePurgeResult()
+
+    while True:
+        ids = db.session.scalars(
+            select(model.id).where(model.is_active.is_(True), model.expires_at <= now).limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(
+            update(model).where(model.id.in_(ids)).values(is_active=False),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        result.deactivated += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    cutoff = now - timedelta(seconds=retention)
+    while True:
+        ids = db.session.scalars(
+            select(model.id)
+            .where(model.is_active.is_(False), func.coalesce(model.expires_at, model.created_at) < cutoff)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        result.deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    return result
@@ -1,10 +1,12 @@
 """Views for managing organizations and memberships."""
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from typing import Tuple
 
-from flask import abort, flash, redirect, render_template, request, url_for
+from flask import abort, current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload
 
 from ..extensions import db
 from ..forms import OrganizationCreateForm, OrganizationInviteForm, OrganizationJoinForm
@@ -49,6 +51,7 @@ def index():
         membership = OrgMembership(organization_id=organization.id, user_id=current_user.id, role="admin")
         db.session.add(membership)
         db.session.commit()
+        current_user.forget_memberships()
 
         set_active_organization(organization)
         flash("Organization created. You're the admin!", "success")
@@ -73,15 +76,28 @@ def index():
             )
             db.session.add(membership)
             db.session.commit()
+            current_user.forget_memberships()
 
             set_active_organization(invite.organization_id)
             flash("Joined organization successfully.", "success")
             return redirect(url_for("dashboard.index"))
 
-    memberships = sorted(current_user.memberships, key=lambda m: m.organization.name.lower())
+    memberships = (
+        OrgMembership.query.options(joinedload(OrgMembership.organization))
+        .filter_by(user_id=current_user.id)
+        .all()
+    )
+    memberships.sort(key=lambda m: m.organization.name.lower())
     active_invites = []
     if active_org and current_user.is_org_admin(active_org):
-        active_invites = [invite for invite in active_org.invites if invite.is_valid()]
+        active_invites = (
+            OrganizationInvite.query.filter(
+                OrganizationInvite.organization_id == active_org.id,
+                OrganizationInvite.valid_clause(),
+            )
+            .order_by(OrganizationInvite.id)
+            .all()
+        )
 
     return render_template(
         "organizations/index.html",
@@ -122,11 +138,13 @@ def create_invite(org_id: int):
 
     invite_form = OrganizationInviteForm(prefix="invite")
     if invite_form.validate_on_submit():
+        ttl = current_app.config["ORGANIZATION_INVITE_TTL"]
         invite = OrganizationInvite(
             organization_id=organization.id,
             code=OrganizationInvite.issue_code(),
             role=invite_form.role.data,
             created_by=current_user,
+            expires_at=datetime.utcnow() + timedelta(seconds=ttl) if ttl > 0 else None,
         )
         db.session.add(invite)
         db.session.commit()
@@ -149,6 +167,10 @@ def revoke_invite(org_id: int, invite_id: int):
         abort(404)
 
     invite.is_active = False
+    # Revoked invites age out of the table from now on.
+    now = datetime.utcnow()
+    if invite.expires_at is None or invite.expires_at > now:
+        invite.expires_at = now
     db.session.commit()
     flash("Invite revoked.", "info")
     return redirect(url_for("organizations.index"))
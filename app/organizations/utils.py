@@ -3,34 +3,43 @@ from __future__ import annotations
 
 from typing import Optional
 
-from flask import session
+from flask import g, session
 from flask_login import current_user
 
 from ..extensions import db
 from ..models import Organization
 
 
-def get_active_organization() -> Optional[Organization]:
-    if not current_user.is_authenticated:
-        return None
-
+def _resolve_active_organization() -> Optional[Organization]:
     org_id = session.get("active_org_id")
     if not org_id:
         return None
 
-    organization = db.session.get(Organization, org_id)
-    if not organization:
+    # The cached role summary rules out stale memberships without loading the row.
+    if org_id not in current_user.membership_roles:
         session.pop("active_org_id", None)
         return None
 
-    if not current_user.get_membership(organization):
+    organization = db.session.get(Organization, org_id)
+    if not organization:
         session.pop("active_org_id", None)
         return None
 
     return organization
 
 
+def get_active_organization() -> Optional[Organization]:
+    """Return the active organization, resolved at most once per request."""
+    if not current_user.is_authenticated:
+        return None
+
+    if "active_organization" not in g:
+        g.active_organization = _resolve_active_organization()
+    return g.active_organization
+
+
 def set_active_organization(organization: Organization | int | None) -> None:
+    g.pop("active_organization", None)
     if organization is None:
         session.pop("active_org_id", None)
         return
@@ -0,0 +1,102 @@
+"""Script authorization pushed down into a single SQL statement.
+
+Ownership, organization membership, the active organization scope and the
+caller's role are resolved by one query joined to ``organization_memberships``,
+and edit or ownership requirements are part of its ``WHERE`` clause. A rejected
+request never loads the script body, only a cheap existence check to tell 403
+from 404, and an accepted one needs no further round trips for the checks.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from flask import abort, session
+from flask_login import current_user
+from sqlalchemy import Select, and_, exists, or_, select
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from .extensions import db
+from .models import OrgMembership, Script
+
+
+def _script_query(script_id: int, content: bool, options: Iterable[LoaderOption]):
+    query_options = list(options)
+    if content:
+        query_options.append(joinedload(Script.blob))
+    return select(Script).where(Script.id == script_id).options(*query_options)
+
+
+def scope_to_workspace(query: Select, user_id: int) -> tuple[Select, OrgMembership]:
+    """Restrict a query over ``Script`` to what the user may open in the active workspace.
+
+    Returns the query, outer-joined to the caller's membership in each script's
+    organization, along with that membership alias so callers can select its role.
+    """
+    membership = aliased(OrgMembership)
+    query = query.outerjoin(
+        membership,
+        and_(membership.organization_id == Script.organization_id, membership.user_id == user_id),
+    )
+
+    visible = or_(Script.owner_id == user_id, membership.id.is_not(None))
+    active_org_id = session.get("active_org_id")
+    if active_org_id:
+        active_member = exists().where(
+            OrgMembership.organization_id == active_org_id,
+            OrgMembership.user_id == user_id,
+        )
+        # A stale active organization falls back to personal scripts, as
+        # get_active_organization() does.
+        scope = or_(
+            and_(Script.organization_id == active_org_id, membership.id.is_not(None)),
+            and_(Script.organization_id.is_(None), ~active_member),
+        )
+    else:
+        scope = Script.organization_id.is_(None)
+    return query.where(visible, scope), membership
+
+
+def load_script(
+    script_id: int,
+    *,
+    require_edit: bool = False,
+    content: bool = False,
+    options: Iterable[LoaderOption] = (),
+) -> Script:
+    """Return a script the current user may open in the active organization scope.
+
+    Raises 404 when the script is missing, not shared with the user, or outside
+    the active organization (personal scripts when none is active), and 403 when
+    ``require_edit`` is set and the user is neither the owner nor an org admin.
+    ``content`` loads the script body with the row; otherwise it is fetched on first use.
+    """
+    user_id = current_user.id
+    query, membership = scope_to_workspace(_script_query(script_id, content, options), user_id)
+    if require_edit:
+        query = query.where(or_(Script.owner_id == user_id, membership.role == "admin"))
+    script = db.session.execute(query).scalar_one_or_none()
+    if script is not None:
+        return script
+
+    if require_edit:
+        visible, _membership = scope_to_workspace(select(Script.id).where(Script.id == script_id), user_id)
+        if db.session.execute(select(visible.exists())).scalar():
+            abort(403)
+    abort(404)
+
+
+def load_owned_script(
+    script_id: int,
+    *,
+    content: bool = False,
+    options: Iterable[LoaderOption] = (),
+) -> Script:
+    """Return a script owned by the current user; 404 if missing, 403 if not theirs."""
+    query = _script_query(script_id, content, options).where(Script.owner_id == current_user.id)
+    script = db.session.execute(query).scalar_one_or_none()
+    if script is not None:
+        return script
+    if db.session.execute(select(exists().where(Script.id == script_id))).scalar():
+        abort(403)
+    abort(404)
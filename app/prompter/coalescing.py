@@ -0,0 +1,127 @@
+"""Coalescing of high-frequency control updates before they fan out to a room."""
+from __future__ import annotations
+
+from threading import Lock
+from time import monotonic
+
+from ..extensions import socketio
+from .metrics import realtime_metrics
+from .wire import binary_room, encode_frame
+
+NAMESPACE = "/control"
+
+# Slider updates and derived keyframes, where only the most recent value matters.
+CONTINUOUS_ACTIONS = frozenset({"speed", "font-size", "line-height", "keyframe"})
+
+
+class ControlCoalescer:
+    """Throttle continuous actions per room and action to one update per tick.
+
+    The first value after a quiet period is sent straight away and later values
+    inside the same tick replace each other, so the room sees the latest one at
+    most ``interval`` seconds later. Discrete actions are never delayed; any
+    pending continuous values for the room are flushed ahead of them so the
+    room observes updates in the order they were sent.
+    """
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.received = 0
+        self.emitted = 0
+        self._pending: dict[tuple[str, str], tuple[object, str | None]] = {}
+        self._last_sent: dict[tuple[str, str], float] = {}
+        self._lock = Lock()
+        self._flusher_running = False
+
+    def submit(self, room: str, action: str, value: object, sender: str | None) -> None:
+        with self._lock:
+            self.received += 1
+        if self.interval <= 0 or action not in CONTINUOUS_ACTIONS:
+            self.flush(room)
+            self._emit(room, action, value, sender)
+            return
+
+        key = (room, action)
+        now = monotonic()
+        start_flusher = False
+        with self._lock:
+            if key not in self._pending and now - self._last_sent.get(key, 0.0) >= self.interval:
+                self._last_sent[key] = now
+                send_now = True
+            else:
+                self._pending[key] = (value, sender)
+                send_now = False
+                start_flusher = not self._flusher_running
+                self._flusher_running = True
+
+        if send_now:
+            self._emit(room, action, value, sender)
+        elif start_flusher:
+            socketio.start_background_task(self._run)
+
+    def flush(self, room: str | None = None) -> None:
+        """Send pending values now, for one room or for every room."""
+        now = monotonic()
+        with self._lock:
+            keys = [key for key in self._pending if room is None or key[0] == room]
+            ready = [(key, self._pending.pop(key)) for key in keys]
+            for key in keys:
+                self._last_sent[key] = now
+        for (target, action), (value, sender) in ready:
+            self._emit(target, action, value, sender)
+
+    def discard(self, room: str) -> None:
+        """Drop pending values for a room that has ended."""
+        with self._lock:
+            for key in [key for key in self._pending if key[0] == room]:
+                del self._pending[key]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"received": self.received, "emitted": self.emitted, "pending": len(self._pending)}
+
+    def _run(self) -> None:
+        while True:
+            socketio.sleep(self.interval)
+            self.flush()
+            with self._lock:
+                if not self._pending:
+                    cutoff = monotonic() - self.interval
+                    self._last_sent = {
+                        key: sent for key, sent in self._last_sent.items() if sent > cutoff
+                    }
+                    self._flusher_running = False
+                    return
+
+    def _emit(self, room: str, action: str, value: object, sender: str | None) -> None:
+        payload = {"action": action, "value": value}
+        ack = realtime_metrics.message_out(room)
+        if ack is not None:
+            # Sampled for delivery latency: clients echo this id in control:ack.
+            payload["ack"] = ack
+        socketio.emit(
+            "teleprompter:update",
+            payload,
+            to=room,
+            namespace=NAMESPACE,
+            skip_sid=sender,
+        )
+        try:
+            frame = encode_frame(action, value)
+        except ValueError:
+            frame = None
+        if frame is not None:
+            # Binary clients get the sampled ack id as a second event argument;
+            # a tuple payload is sent as separate arguments.
+            socketio.emit(
+                "teleprompter:frame",
+                frame if ack is None else (frame, ack),
+                to=binary_room(room),
+                namespace=NAMESPACE,
+                skip_sid=sender,
+            )
+        with self._lock:
+            self.emitted += 1
+
+
+control_updates = ControlCoalescer()
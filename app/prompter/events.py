@@ -1,36 +1,76 @@
 """Socket.IO events to sync teleprompter and remote control."""
 from __future__ import annotations
 
-from flask import current_app
+from datetime import datetime
+
+from flask import current_app, request
 from flask_socketio import emit, join_room, leave_room
 
 from ..extensions import db, socketio
-from ..models import RemoteControlSession
-
-ROOM_PREFIX = "script:"
+from ..models import RemoteControlSession, Script
+from .coalescing import control_updates
+from .metrics import realtime_metrics
+from .reaper import close_room
+from .sessions import connections, control_sessions
+from .state import room_states, server_time
+from .wire import ENCODING_BINARY, ENCODING_JSON, binary_room, decode_frame
 
 
 def _room_for_token(token: str) -> str | None:
-    session = RemoteControlSession.query.filter_by(control_token=token, is_active=True).first()
-    if not session:
-        return None
-    return f"{ROOM_PREFIX}{session.script_id}"
+    return control_sessions.room_for_token(token)
+
+
+def _dispatch(room: str, action: str, value: object) -> None:
+    if action == "keyframe":
+        # Keyframes are derived server side; clients may not forge them.
+        return
+    realtime_metrics.message_in(room)
+    applied = room_states.apply(room, action, value)
+    if not applied.accepted:
+        # Forwarding a value the state rejected would leave clients and the
+        # server snapshot disagreeing.
+        return
+    control_updates.submit(room, action, value, request.sid)
+    if applied.keyframe is not None:
+        control_updates.submit(room, "keyframe", applied.keyframe, None)
+
+
+def _seed_room(room: str, token: str) -> None:
+    if room in room_states:
+        return
+    speed = (
+        db.session.query(Script.scroll_speed)
+        .join(RemoteControlSession, RemoteControlSession.script_id == Script.id)
+        .filter(RemoteControlSession.control_token == token)
+        .scalar()
+    )
+    room_states.seed(room, speed or current_app.config["DEFAULT_SCROLL_SPEED"])
 
 
 @socketio.on("join", namespace="/control")
+@realtime_metrics.timed("join")
 def control_join(data: dict[str, str | int]) -> None:
     token = str(data.get("token", ""))
     room = _room_for_token(token)
     if not room:
+        realtime_metrics.join_failed()
         emit("error", {"message": "Invalid or expired control token."})
         return
 
-    join_room(room)
-    emit("joined", {"room": room})
+    encoding = ENCODING_JSON
+    if data.get("encoding") == ENCODING_BINARY and current_app.config["CONTROL_BINARY_FRAMES"]:
+        encoding = ENCODING_BINARY
+
+    join_room(binary_room(room) if encoding == ENCODING_BINARY else room)
+    connections.bind(request.sid, token, encoding)
+    _seed_room(room, token)
+    emit("joined", {"room": room, "encoding": encoding})
+    emit("teleprompter:snapshot", room_states.snapshot(room))
     current_app.logger.debug("Client joined room %s", room)
 
 
 @socketio.on("leave", namespace="/control")
+@realtime_metrics.timed("leave")
 def control_leave(data: dict[str, str]) -> None:
     token = str(data.get("token", ""))
     room = _room_for_token(token)
@@ -39,10 +79,13 @@ def control_leave(data: dict[str, str]) -> None:
         return
 
     leave_room(room)
+    leave_room(binary_room(room))
+    connections.release(request.sid)
     emit("left", {"room": room})
 
 
 @socketio.on("control:update", namespace="/control")
+@realtime_metrics.timed("control:update")
 def control_update(data: dict[str, object]) -> None:
     token = str(data.get("token", ""))
     room = _room_for_token(token)
@@ -50,23 +93,63 @@ def control_update(data: dict[str, object]) -> None:
         emit("error", {"message": "Invalid control token."})
         return
 
-    payload = {
-        "action": data.get("action"),
-        "value": data.get("value"),
-    }
-    emit("teleprompter:update", payload, room=room, include_self=False)
+    _dispatch(room, data.get("action"), data.get("value"))
+
+
+@socketio.on("control:frame", namespace="/control")
+@realtime_metrics.timed("control:frame")
+def control_frame(frame: bytes) -> None:
+    binding = connections.get(request.sid)
+    room = _room_for_token(binding[0]) if binding else None
+    if not room:
+        emit("error", {"message": "Invalid control token."})
+        return
+
+    try:
+        action, value = decode_frame(frame)
+    except ValueError:
+        emit("error", {"message": "Malformed control frame."})
+        return
+    _dispatch(room, action, value)
+
+
+@socketio.on("control:ack", namespace="/control")
+def control_ack(seq: object = None) -> None:
+    # Only sockets that joined a room receive sampled updates to ack.
+    if connections.get(request.sid):
+        realtime_metrics.acked(seq, request.sid)
+
+
+@socketio.on("clock:ping", namespace="/control")
+@realtime_metrics.timed("clock:ping")
+def clock_ping(sent_at: float | None = None) -> dict[str, float | None]:
+    """Answer a clock probe so the client can estimate its offset from server time."""
+    return {"sent_at": sent_at, "server_time": server_time()}
 
 
 @socketio.on("control:end", namespace="/control")
+@realtime_metrics.timed("control:end")
 def control_end(data: dict[str, str]) -> None:
     token = str(data.get("token", ""))
     session = RemoteControlSession.query.filter_by(control_token=token, is_active=True).first()
-    if not session:
+    if not session or not session.is_valid():
         emit("error", {"message": "Invalid control token."})
         return
 
     session.is_active = False
+    # Ended sessions age out of the table from now on.
+    session.expires_at = datetime.utcnow()
     db.session.commit()
-    room = f"{ROOM_PREFIX}{session.script_id}"
-    emit("teleprompter:end", room=room)
+    close_room(session.script_id, token)
     current_app.logger.info("Remote session %s ended", session.id)
+
+
+@socketio.on("connect", namespace="/control")
+def control_connect(auth: object = None) -> None:
+    realtime_metrics.connected()
+
+
+@socketio.on("disconnect", namespace="/control")
+def control_disconnect(reason: object = None) -> None:
+    realtime_metrics.disconnected()
+    connections.release(request.sid)
@@ -0,0 +1,188 @@
+"""In-process metrics for the ``/control`` namespace, rendered for Prometheus.
+
+Recording is a counter bump or a bisect into a fixed bucket list under one
+lock, so it stays cheap enough for every message. Values are per process; scrape
+each worker separately.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from functools import wraps
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Callable, Iterable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., object])
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Acks older than this are assumed lost and dropped from the pending table.
+ACK_TIMEOUT = 30.0
+MAX_PENDING_ACKS = 10000
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str = "") -> Iterable[str]:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.total}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RealtimeMetrics:
+    def __init__(self, ack_every: int = 10) -> None:
+        self.ack_every = ack_every
+        self._lock = Lock()
+        self._handlers: dict[str, Histogram] = defaultdict(Histogram)
+        self._delivery = Histogram()
+        self._room_in: dict[str, int] = defaultdict(int)
+        self._room_out: dict[str, int] = defaultdict(int)
+        self._connected = 0
+        self._join_failures = 0
+        self._emitted = 0
+        self._ack_seq = 0
+        # Sequence number -> (emitted at, sids that have acked it).
+        self._pending_acks: dict[int, tuple[float, set[str]]] = {}
+
+    def timed(self, event: str) -> Callable[[F], F]:
+        """Decorate a Socket.IO handler to record how long it takes."""
+
+        def decorator(func: F) -> F:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = perf_counter() - started
+                    with self._lock:
+                        self._handlers[event].observe(elapsed)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def connected(self) -> None:
+        with self._lock:
+            self._connected += 1
+
+    def disconnected(self) -> None:
+        with self._lock:
+            self._connected = max(self._connected - 1, 0)
+
+    def join_failed(self) -> None:
+        with self._lock:
+            self._join_failures += 1
+
+    def message_in(self, room: str) -> None:
+        with self._lock:
+            self._room_in[room] += 1
+
+    def message_out(self, room: str) -> int | None:
+        """Count an emitted update and return an ack id if this one is sampled."""
+        with self._lock:
+            self._room_out[room] += 1
+            self._emitted += 1
+            if self.ack_every <= 0 or self._emitted % self.ack_every:
+                return None
+            self._ack_seq += 1
+            now = monotonic()
+            self._pending_acks[self._ack_seq] = (now, set())
+            if len(self._pending_acks) > MAX_PENDING_ACKS:
+                self._expire_acks(now)
+            return self._ack_seq
+
+    def acked(self, seq: object, sid: str) -> None:
+        """Record delivery latency for an ack, counting each socket at most once per update."""
+        with self._lock:
+            pending = self._pending_acks.get(seq) if isinstance(seq, int) else None
+            if pending is None:
+                return
+            sent_at, acked_by = pending
+            if sid in acked_by:
+                return
+            acked_by.add(sid)
+            self._delivery.observe(monotonic() - sent_at)
+
+    def forget_room(self, room: str) -> None:
+        with self._lock:
+            self._room_in.pop(room, None)
+            self._room_out.pop(room, None)
+
+    def _expire_acks(self, now: float) -> None:
+        cutoff = now - ACK_TIMEOUT
+        for seq, (sent_at, _acked_by) in list(self._pending_acks.items()):
+            if sent_at >= cutoff and len(self._pending_acks) <= MAX_PENDING_ACKS // 2:
+                break
+            del self._pending_acks[seq]
+
+    def render(self, extra: dict[str, tuple[str, str, float]] | None = None) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        ``extra`` maps further metric names to ``(type, help, value)``.
+        """
+        lines: list[str] = []
+        with self._lock:
+            lines += [
+                "# HELP promptly_control_handler_seconds Time spent in /control event handlers.",
+                "# TYPE promptly_control_handler_seconds histogram",
+            ]
+            for event, histogram in sorted(self._handlers.items()):
+                lines += histogram.samples("promptly_control_handler_seconds", f'event="{_label(event)}"')
+            lines += [
+                "# HELP promptly_control_delivery_seconds Time from emitting an update to a client acking it.",
+                "# TYPE promptly_control_delivery_seconds histogram",
+                *self._delivery.samples("promptly_control_delivery_seconds"),
+                "# HELP promptly_control_messages_in_total Control messages received per room.",
+                "# TYPE promptly_control_messages_in_total counter",
+            ]
+            lines += [
+                f'promptly_control_messages_in_total{{room="{_label(room)}"}} {count}'
+                for room, count in sorted(self._room_in.items())
+            ]
+            lines += [
+                "# HELP promptly_control_messages_out_total Updates emitted per room, after coalescing.",
+                "# TYPE promptly_control_messages_out_total counter",
+            ]
+            lines += [
+                f'promptly_control_messages_out_total{{room="{_label(room)}"}} {count}'
+                for room, count in sorted(self._room_out.items())
+            ]
+            lines += [
+                "# HELP promptly_control_connected_clients Connected /control clients.",
+                "# TYPE promptly_control_connected_clients gauge",
+                f"promptly_control_connected_clients {self._connected}",
+                "# HELP promptly_control_join_failures_total Joins rejected for an invalid or expired token.",
+                "# TYPE promptly_control_join_failures_total counter",
+                f"promptly_control_join_failures_total {self._join_failures}",
+            ]
+        for name, (kind, help_text, value) in sorted((extra or {}).items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+realtime_metrics = RealtimeMetrics()
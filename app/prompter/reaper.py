@@ -0,0 +1,135 @@
+"""Expiry of remote control sessions in batched statements."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import delete, func, select, update
+
+from ..extensions import db, socketio
+from ..models import RemoteControlSession
+from .coalescing import NAMESPACE, control_updates
+from .metrics import realtime_metrics
+from .sessions import control_sessions, room_for_script
+from .state import room_states
+from .wire import binary_room
+
+
+@dataclass(slots=True)
+class ReapResult:
+    deactivated: int = 0
+    deleted: int = 0
+
+
+def close_room(script_id: int, token: str) -> None:
+    """Tell a session's room it has ended and drop everything cached for it."""
+    control_sessions.invalidate(token)
+    room = room_for_script(script_id)
+    control_updates.discard(room)
+    room_states.discard(room)
+    realtime_metrics.forget_room(room)
+    socketio.emit("teleprompter:end", to=[room, binary_room(room)], namespace=NAMESPACE)
+
+
+def reap_remote_sessions(
+    *,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    retention: int | None = None,
+) -> ReapResult:
+    """End expired sessions, then delete ended rows older than the retention period.
+
+    Each batch is one ``UPDATE``/``DELETE ... WHERE id IN (...)`` and its own
+    transaction, so a large backlog never holds a long lock.
+    """
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = batch_size or config["REMOTE_SESSION_REAP_BATCH"]
+    retention = config["REMOTE_SESSION_RETENTION"] if retention is None else retention
+    ttl = config["REMOTE_SESSION_TTL"]
+    model = RemoteControlSession
+    result = ReapResult()
+
+    if ttl > 0:
+        # Sessions issued before expiries existed get one full TTL from now.
+        db.session.execute(
+            update(model)
+            .where(model.is_active.is_(True), model.expires_at.is_(None))
+            .values(expires_at=now + timedelta(seconds=ttl))
+        )
+        db.session.commit()
+
+    while True:
+        ids = db.session.scalars(
+            select(model.id)
+            .where(model.is_active.is_(True), model.expires_at <= now)
+            .order_by(model.expires_at)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        # Only rooms whose session this call actually ended are notified, so a
+        # second reaper racing on the same batch never ends a room twice.
+        ended = db.session.execute(
+            update(model)
+            .where(model.id.in_(ids), model.is_active.is_(True))
+            .values(is_active=False)
+            .returning(model.script_id, model.control_token),
+            execution_options={"synchronize_session": False},
+        ).all()
+        db.session.commit()
+        for row in ended:
+            close_room(row.script_id, row.control_token)
+        result.deactivated += len(ended)
+        if len(ids) < batch_size:
+            break
+
+    cutoff = now - timedelta(seconds=retention)
+    while True:
+        ids = db.session.scalars(
+            select(model.id)
+            .where(model.is_active.is_(False), func.coalesce(model.expires_at, model.created_at) < cutoff)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        result.deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    return result
+
+
+def start_session_reaper(app: Flask) -> None:
+    """Run :func:`reap_remote_sessions` every ``REMOTE_SESSION_REAP_INTERVAL`` seconds.
+
+    Does nothing unless ``REMOTE_SESSION_REAPER`` is enabled for this process.
+    """
+    interval = app.config["REMOTE_SESSION_REAP_INTERVAL"]
+    if interval <= 0 or not app.config["REMOTE_SESSION_REAPER"]:
+        return
+
+    def run() -> None:
+        while True:
+            socketio.sleep(interval)
+            with app.app_context():
+                try:
+                    result = reap_remote_sessions()
+                except Exception:  # noqa: BLE001 - keep the loop alive
+                    db.session.rollback()
+                    app.logger.exception("Remote session reaper failed")
+                    continue
+                if result.deactivated or result.deleted:
+                    app.logger.info(
+                        "Reaped remote sessions: %s ended, %s deleted",
+                        result.deactivated,
+                        result.deleted,
+                    )
+
+    socketio.start_background_task(run)
@@ -1,36 +1,56 @@
 """Routes for rendering teleprompter view."""
 from __future__ import annotations
 
-from flask import abort, current_app, render_template
-from flask_login import current_user, login_required
+from flask import current_app, jsonify, render_template, request
+from flask_login import login_required
+from sqlalchemy.orm import joinedload
 
 from ..models import Script
-from ..organizations.utils import get_active_organization
+from ..permissions import load_script
 from . import prompter_bp
 
 
-def _ensure_access(script: Script) -> None:
-    if not current_user.can_access_script(script):
-        abort(404)
-
-    active_org = get_active_organization()
-    if active_org:
-        if script.organization_id != active_org.id:
-            abort(404)
-    elif script.organization_id is not None:
-        abort(404)
-
-
 @prompter_bp.route("/prompter/<int:script_id>")
 @login_required
 def view(script_id: int):
-    script = Script.query.get_or_404(script_id)
-    _ensure_access(script)
+    script = load_script(script_id, options=(joinedload(Script.control_session),))
+
+    paragraphs = script.rendered_paragraphs()
+    chunk_size = current_app.config["PROMPTER_CHUNK_SIZE"]
 
     return render_template(
         "prompter/view.html",
         script=script,
+        paragraphs=paragraphs[:chunk_size],
+        paragraph_count=len(paragraphs),
+        chunk_size=chunk_size,
+        sync_scroll=request.args.get("sync") == "1",
         default_speed=current_app.config["DEFAULT_SCROLL_SPEED"],
         default_theme=current_app.config["DEFAULT_THEME"],
-        control_token=script.control_session.control_token if script.control_session else None,
+        control_token=(
+            script.control_session.control_token
+            if script.control_session and script.control_session.is_valid()
+            else None
+        ),
+    )
+
+
+@prompter_bp.get("/prompter/<int:script_id>/paragraphs")
+@login_required
+def paragraphs(script_id: int):
+    """Return a window of rendered paragraphs so long scripts can be paged in."""
+    script = load_script(script_id)
+
+    blocks = script.rendered_paragraphs()
+    start = max(request.args.get("start", 0, type=int), 0)
+    count = request.args.get("count", current_app.config["PROMPTER_CHUNK_SIZE"], type=int)
+    count = min(max(count, 0), current_app.config["PROMPTER_MAX_CHUNK_SIZE"])
+
+    return jsonify(
+        {
+            "script_id": script.id,
+            "start": start,
+            "total": len(blocks),
+            "paragraphs": [str(block) for block in blocks[start : start + count]],
+        }
     )
@@ -0,0 +1,120 @@
+"""In-process lookup cache for remote control tokens."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from time import monotonic
+
+from ..models import RemoteControlSession
+from ..replicas import read_from_primary, routing_to_replica
+
+ROOM_PREFIX = "script:"
+
+
+def room_for_script(script_id: int) -> str:
+    return f"{ROOM_PREFIX}{script_id}"
+
+
+def find_valid_session(token: str) -> RemoteControlSession | None:
+    """Load the live session for ``token``.
+
+    A replica may not have caught up with a token issued moments ago, so a miss
+    there is confirmed on the primary, which then serves the rest of the request.
+    """
+    query = RemoteControlSession.query.filter_by(control_token=token, is_active=True)
+    session = query.first()
+    if (session is None or not session.is_valid()) and routing_to_replica():
+        read_from_primary()
+        session = query.execution_options(populate_existing=True).first()
+    return session if session and session.is_valid() else None
+
+
+@dataclass(slots=True)
+class _Entry:
+    room: str | None
+    active: bool
+    expires_at: float
+
+
+class ControlSessionCache:
+    """Map control tokens to their room and active flag for a short TTL.
+
+    Entries are dropped explicitly when a session is created or ended in this
+    process; other processes see the change once their entry expires.
+    """
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 10000) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, _Entry] = {}
+        self._lock = Lock()
+
+    def room_for_token(self, token: str) -> str | None:
+        """Return the room for an active token, or ``None`` if it is unknown or ended."""
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry.expires_at > now:
+                self.hits += 1
+                return entry.room if entry.active else None
+            self.misses += 1
+
+        session = find_valid_session(token)
+        ttl = self.ttl
+        if session and session.expires_at:
+            # Never cache a token past the moment its session expires.
+            ttl = min(ttl, max((session.expires_at - datetime.utcnow()).total_seconds(), 0.0))
+        entry = _Entry(
+            room=room_for_script(session.script_id) if session else None,
+            active=session is not None,
+            expires_at=now + ttl,
+        )
+        with self._lock:
+            self._entries.pop(token, None)
+            self._entries[token] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.pop(next(iter(self._entries)))
+        return entry.room if entry.active else None
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class ConnectionBindings:
+    """Remember which token and encoding each Socket.IO connection joined with."""
+
+    def __init__(self) -> None:
+        self._bindings: dict[str, tuple[str, str]] = {}
+        self._lock = Lock()
+
+    def bind(self, sid: str, token: str, encoding: str) -> None:
+        with self._lock:
+            self._bindings[sid] = (token, encoding)
+
+    def get(self, sid: str) -> tuple[str, str] | None:
+        with self._lock:
+            return self._bindings.get(sid)
+
+    def release(self, sid: str) -> None:
+        with self._lock:
+            self._bindings.pop(sid, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._bindings)
+
+
+control_sessions = ControlSessionCache()
+connections = ConnectionBindings()
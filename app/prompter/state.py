@@ -0,0 +1,264 @@
+"""Authoritative playback state for each control room."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field, fields
+import json
+import math
+from threading import Lock
+import time
+
+# Pixels scrolled per second at speed 1.0; matches the loop in prompter.js.
+SCROLL_PIXELS_PER_SECOND = 120
+
+# Actions that move the playhead and therefore produce a new keyframe.
+KEYFRAME_ACTIONS = frozenset({"toggle", "playing", "rewind", "seek", "speed"})
+
+
+def _as_bool(value: object) -> bool:
+    return value is True or value == "true"
+
+
+def server_time() -> float:
+    """Wall clock in milliseconds, the unit clients use for clock sync."""
+    return time.time() * 1000
+
+
+@dataclass(slots=True)
+class Keyframe:
+    """Where the playhead was at ``started_at`` and how fast it moves from there.
+
+    ``offset`` is in pixels below paragraph ``anchor``; ``started_at`` is server
+    time in milliseconds, or ``None`` while paused.
+    """
+
+    anchor: int = 0
+    offset: float = 0.0
+    speed: float = 1.0
+    started_at: float | None = None
+
+    def position(self, now: float) -> float:
+        if self.started_at is None:
+            return self.offset
+        elapsed = max(now - self.started_at, 0.0) / 1000
+        return self.offset + elapsed * self.speed * SCROLL_PIXELS_PER_SECOND
+
+    def play(self, now: float) -> None:
+        if self.started_at is None:
+            self.started_at = now
+
+    def pause(self, now: float) -> None:
+        self.offset = self.position(now)
+        self.started_at = None
+
+    def move(self, anchor: int, now: float) -> None:
+        self.anchor = anchor
+        self.offset = 0.0
+        if self.started_at is not None:
+            self.started_at = now
+
+    def retime(self, speed: float, now: float) -> None:
+        if self.started_at is not None:
+            self.offset = self.position(now)
+            self.started_at = now
+        self.speed = speed
+
+    def to_dict(self) -> dict[str, object]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class PlaybackState:
+    """Latest known value of every setting a control message can change.
+
+    Settings nobody has touched yet stay ``None`` and are left out of snapshots,
+    so clients keep their own defaults for them.
+    """
+
+    playing: bool | None = None
+    speed: float | None = None
+    font_size: int | None = None
+    line_height: int | None = None
+    theme: str | None = None
+    mirror: bool | None = None
+    uppercase: bool | None = None
+    guidelines: bool | None = None
+    paragraph: int | None = None
+    keyframe: Keyframe = field(default_factory=Keyframe)
+    version: int = 0
+
+    def apply(self, action: str, value: object, now: float | None = None) -> bool:
+        """Fold one control message into the state; return ``False`` if it is ignored."""
+        now = server_time() if now is None else now
+        try:
+            if action == "toggle":
+                self._set_playing(not self.playing, now)
+            elif action == "playing":
+                self._set_playing(_as_bool(value), now)
+            elif action == "rewind":
+                self._set_playing(False, now)
+                self.paragraph = 0
+                self.keyframe.move(0, now)
+            elif action == "seek":
+                self.paragraph = max(int(value), 0)
+                self.keyframe.move(self.paragraph, now)
+            elif action == "speed":
+                speed = float(value)
+                if not math.isfinite(speed):
+                    return False
+                self.speed = speed
+                self.keyframe.retime(speed, now)
+            elif action == "font-size":
+                self.font_size = int(value)
+            elif action == "line-height":
+                self.line_height = int(value)
+            elif action == "theme":
+                self.theme = str(value)
+            elif action in ("mirror", "uppercase", "guidelines"):
+                setattr(self, action, _as_bool(value))
+            else:
+                return False
+        except (TypeError, ValueError):
+            return False
+        self.version += 1
+        return True
+
+    def _set_playing(self, playing: bool, now: float) -> None:
+        self.playing = playing
+        if playing:
+            self.keyframe.play(now)
+        else:
+            self.keyframe.pause(now)
+
+    def to_dict(self) -> dict[str, object]:
+        data: dict[str, object] = {}
+        for item in fields(self):
+            value = getattr(self, item.name)
+            if isinstance(value, Keyframe):
+                value = value.to_dict()
+            if value is not None:
+                data[item.name.replace("_", "-")] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> PlaybackState:
+        """Rebuild a state from :meth:`to_dict` output."""
+        values = {name.replace("-", "_"): value for name, value in data.items()}
+        keyframe = Keyframe(**values.pop("keyframe", {}))
+        return cls(keyframe=keyframe, **values)
+
+
+@dataclass(slots=True)
+class Applied:
+    """Outcome of a control message: whether the state took it, and any new keyframe."""
+
+    accepted: bool
+    keyframe: dict[str, object] | None = None
+
+
+class RoomStateStore:
+    """Map of room name to its :class:`PlaybackState`.
+
+    State lives in this process until :meth:`connect` points the store at Redis.
+    Every realtime worker then reads and updates the same state, so a prompter
+    joining on any worker gets the current snapshot. Updates there are
+    optimistic ``WATCH``/``MULTI`` transactions retried on conflict.
+    """
+
+    def __init__(self, ttl: int = 86400) -> None:
+        self.ttl = ttl
+        self._rooms: dict[str, PlaybackState] = {}
+        self._lock = Lock()
+        self._redis = None
+        self._prefix = ""
+
+    def connect(self, url: str | None, namespace: str = "promptly") -> None:
+        """Keep state in the Redis at ``url``, or in this process when ``None``."""
+        if not url:
+            self._redis = None
+            return
+
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = f"{namespace}:room-state:"
+
+    @property
+    def shared(self) -> bool:
+        return self._redis is not None
+
+    def seed(self, room: str, speed: float) -> None:
+        """Start a room at the script's own speed, unless it already has state."""
+        state = PlaybackState(keyframe=Keyframe(speed=speed))
+        if self._redis is not None:
+            self._redis.set(self._prefix + room, json.dumps(state.to_dict()), nx=True, ex=self.ttl)
+            return
+        with self._lock:
+            if room not in self._rooms:
+                self._rooms[room] = state
+
+    def apply(self, room: str, action: str, value: object) -> Applied:
+        """Apply a control message, with the new keyframe if the playhead moved."""
+        if self._redis is not None:
+            return self._apply_shared(room, action, value)
+        with self._lock:
+            state = self._rooms.get(room)
+            if state is None:
+                state = self._rooms[room] = PlaybackState()
+            return self._applied(state, action, value)
+
+    def _apply_shared(self, room: str, action: str, value: object) -> Applied:
+        from redis.exceptions import WatchError
+
+        key = self._prefix + room
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    state = PlaybackState.from_dict(json.loads(raw)) if raw else PlaybackState()
+                    applied = self._applied(state, action, value)
+                    if not applied.accepted:
+                        pipe.unwatch()
+                        return applied
+                    pipe.multi()
+                    pipe.set(key, json.dumps(state.to_dict()), ex=self.ttl)
+                    pipe.execute()
+                    return applied
+                except WatchError:
+                    continue
+
+    @staticmethod
+    def _applied(state: PlaybackState, action: str, value: object) -> Applied:
+        if not state.apply(action, value):
+            return Applied(False)
+        return Applied(True, state.keyframe.to_dict() if action in KEYFRAME_ACTIONS else None)
+
+    def __contains__(self, room: str) -> bool:
+        if self._redis is not None:
+            return bool(self._redis.exists(self._prefix + room))
+        with self._lock:
+            return room in self._rooms
+
+    def snapshot(self, room: str) -> dict[str, object]:
+        if self._redis is not None:
+            raw = self._redis.get(self._prefix + room)
+            return json.loads(raw) if raw else {"version": 0}
+        with self._lock:
+            state = self._rooms.get(room)
+            return state.to_dict() if state else {"version": 0}
+
+    def discard(self, room: str) -> None:
+        if self._redis is not None:
+            self._redis.delete(self._prefix + room)
+            return
+        with self._lock:
+            self._rooms.pop(room, None)
+
+    def __len__(self) -> int:
+        if self._redis is not None:
+            return sum(1 for _ in self._redis.scan_iter(match=self._prefix + "*", count=500))
+        with self._lock:
+            return len(self._rooms)
+
+
+room_states = RoomStateStore()
@@ -0,0 +1,134 @@
+"""Compact binary encoding for control messages.
+
+A frame is one byte of action code, one byte of value type and the value::
+
+    | action (u8) | type (u8) | value (0, 4 or n bytes, big endian) |
+
+Clients opt in by joining with ``encoding="binary"``; the connection is then
+bound to its token server side, so frames carry no token. The code tables here
+are mirrored in ``static/js/wire.js`` and must only ever be appended to.
+"""
+from __future__ import annotations
+
+import math
+import struct
+
+ENCODING_JSON = "json"
+ENCODING_BINARY = "binary"
+BINARY_ROOM_SUFFIX = "#bin"
+
+ACTIONS = (
+    "toggle",
+    "rewind",
+    "seek",
+    "speed",
+    "font-size",
+    "line-height",
+    "theme",
+    "mirror",
+    "uppercase",
+    "guidelines",
+    "playing",
+    "keyframe",
+)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS, start=1)}
+
+TYPE_NONE = 0
+TYPE_FALSE = 1
+TYPE_TRUE = 2
+TYPE_INT = 3
+TYPE_FLOAT = 4
+TYPE_STRING = 5
+TYPE_KEYFRAME = 6
+
+_VALUE_TYPES = {
+    "toggle": None,
+    "rewind": None,
+    "seek": int,
+    "speed": float,
+    "font-size": int,
+    "line-height": int,
+    "theme": str,
+    "mirror": bool,
+    "uppercase": bool,
+    "guidelines": bool,
+    "playing": bool,
+    "keyframe": dict,
+}
+
+_HEADER = struct.Struct("!BB")
+_INT = struct.Struct("!i")
+_FLOAT = struct.Struct("!f")
+# anchor, offset, speed, started_at (NaN while paused)
+_KEYFRAME = struct.Struct("!iffd")
+
+
+def binary_room(room: str) -> str:
+    """Room holding the connections that negotiated binary frames."""
+    return f"{room}{BINARY_ROOM_SUFFIX}"
+
+
+def encode_frame(action: str, value: object) -> bytes:
+    """Encode ``action`` with its value coerced to the action's type.
+
+    Raises :class:`ValueError` for unknown actions or values that do not fit.
+    """
+    code = ACTION_CODES.get(action)
+    if code is None:
+        raise ValueError(f"Unknown action {action!r}")
+    kind = _VALUE_TYPES[action]
+    try:
+        if kind is None:
+            return _HEADER.pack(code, TYPE_NONE)
+        if kind is bool:
+            flag = value is True or value == "true"
+            return _HEADER.pack(code, TYPE_TRUE if flag else TYPE_FALSE)
+        if kind is int:
+            return _HEADER.pack(code, TYPE_INT) + _INT.pack(int(value))
+        if kind is float:
+            return _HEADER.pack(code, TYPE_FLOAT) + _FLOAT.pack(float(value))
+        if kind is dict:
+            started_at = value["started_at"]
+            return _HEADER.pack(code, TYPE_KEYFRAME) + _KEYFRAME.pack(
+                int(value["anchor"]),
+                float(value["offset"]),
+                float(value["speed"]),
+                math.nan if started_at is None else float(started_at),
+            )
+        return _HEADER.pack(code, TYPE_STRING) + str(value).encode("utf-8")
+    except (KeyError, TypeError, OverflowError, struct.error) as exc:
+        raise ValueError(f"Invalid value for {action!r}") from exc
+
+
+def decode_frame(frame: bytes) -> tuple[str, object]:
+    """Return ``(action, value)`` for a frame, raising :class:`ValueError` if malformed."""
+    if not isinstance(frame, (bytes, bytearray)) or len(frame) < _HEADER.size:
+        raise ValueError("Frame too short")
+    code, kind = _HEADER.unpack_from(frame)
+    if not 0 < code <= len(ACTIONS):
+        raise ValueError(f"Unknown action code {code}")
+    action = ACTIONS[code - 1]
+    body = bytes(frame[_HEADER.size :])
+
+    if kind == TYPE_NONE and not body:
+        return action, None
+    if kind in (TYPE_FALSE, TYPE_TRUE) and not body:
+        return action, kind == TYPE_TRUE
+    if kind == TYPE_INT and len(body) == _INT.size:
+        return action, _INT.unpack(body)[0]
+    if kind == TYPE_FLOAT and len(body) == _FLOAT.size:
+        return action, round(_FLOAT.unpack(body)[0], 4)
+    if kind == TYPE_KEYFRAME and len(body) == _KEYFRAME.size:
+        anchor, offset, speed, started_at = _KEYFRAME.unpack(body)
+        return action, {
+            "anchor": anchor,
+            "offset": offset,
+            "speed": round(speed, 4),
+            "started_at": None if math.isnan(started_at) else started_at,
+        }
+    if kind == TYPE_STRING:
+        try:
+            return action, body.decode("utf-8")
+        except UnicodeDecodeError as exc:
+            raise ValueError("Invalid string value") from exc
+    raise ValueError(f"Malformed value for {action!r}")
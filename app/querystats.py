@@ -0,0 +1,139 @@
+"""Count SQL statements and database time per request and per Socket.IO event.
+
+Every statement on the app's engines is timed. Inside a request context, which
+Flask-SocketIO also pushes for each event it dispatches, the totals collect on
+``g`` and are logged when the context ends; ``SQL_QUERY_HEADERS`` adds them to
+HTTP responses. Statements slower than ``SQL_SLOW_QUERY_SECONDS`` are logged
+with the route that issued them. :func:`assert_max_queries` bounds how many
+statements a block of code, such as a test client request, may send.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterator
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .extensions import db
+
+_STARTED = "query_started"
+_recorders: ContextVar[tuple["QueryStats", ...]] = ContextVar("query_recorders", default=())
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] | None = field(default=None, repr=False)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+def current_route() -> str:
+    """Name the request or Socket.IO event being served, for logs."""
+    if not has_request_context():
+        return "-"
+    socket_event = getattr(request, "event", None)
+    if socket_event:
+        return f"{request.namespace} {socket_event['message']}"
+    return f"{request.method} {request.url_rule or request.path}"
+
+
+def request_stats() -> QueryStats:
+    """Totals so far for the current request or Socket.IO event."""
+    stats = g.get("query_stats")
+    if stats is None:
+        stats = g.query_stats = QueryStats()
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_STARTED, []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = perf_counter() - conn.info[_STARTED].pop()
+    for recorder in _recorders.get():
+        recorder.record(statement, elapsed)
+    if not has_app_context():
+        return
+    if has_request_context():
+        request_stats().record(statement, elapsed)
+    threshold = current_app.config["SQL_SLOW_QUERY_SECONDS"]
+    if threshold > 0 and elapsed >= threshold:
+        current_app.logger.warning("Slow query in %s (%.1f ms): %s", current_route(), elapsed * 1000, statement)
+
+
+def _handle_error(exception_context) -> None:
+    started = exception_context.connection.info.get(_STARTED) if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+def init_query_stats(app: Flask) -> None:
+    """Time statements on every engine of ``app`` and report totals per request."""
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+
+    @app.after_request
+    def add_query_headers(response: Response) -> Response:
+        if app.config["SQL_QUERY_HEADERS"]:
+            stats = request_stats()
+            response.headers["X-Query-Count"] = str(stats.count)
+            response.headers.add(
+                "Server-Timing", f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'
+            )
+        return response
+
+    @app.teardown_request
+    def log_query_stats(exc: BaseException | None = None) -> None:
+        stats = g.get("query_stats")
+        if stats is None:
+            return
+        warn_count = app.config["SQL_QUERY_WARN_COUNT"]
+        log = app.logger.warning if 0 < warn_count < stats.count else app.logger.debug
+        log("%s: %d queries in %.1f ms", current_route(), stats.count, stats.seconds * 1000)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Record every statement sent to an instrumented engine inside the block."""
+    stats = QueryStats(statements=[])
+    token = _recorders.set(_recorders.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _recorders.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail, listing the statements, when the block sends more than ``limit`` of them.
+
+    Usage::
+
+        with assert_max_queries(2):
+            client.get("/")
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        listing = "\n".join(f"  {statement}" for statement in stats.statements or ())
+        raise AssertionError(f"{stats.count} queries, expected at most {limit}:\n{listing}")
@@ -0,0 +1,140 @@
+"""Route read-only queries to replica databases.
+
+Replicas are configured with ``DATABASE_REPLICA_URLS`` and registered as
+``replica_<n>`` binds. During a ``GET``/``HEAD``/``OPTIONS`` request, including
+Socket.IO events, plain ``SELECT`` statements go to one replica picked for the
+request. Everything else uses the primary: flushes and DML, any read after the
+session has written, requests outside a request context, and all requests
+from a browser for ``DATABASE_REPLICA_STICKY_SECONDS`` after it committed a
+write, so users read their own writes while replicas catch up.
+"""
+from __future__ import annotations
+
+from functools import wraps
+import random
+import sqlite3
+import time
+from typing import Callable, TypeVar
+
+from flask import current_app, g, has_request_context, request, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+from sqlalchemy.sql import Select
+
+F = TypeVar("F", bound=Callable[..., object])
+
+REPLICA_PREFIX = "replica_"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+_STICKY_KEY = "_db_primary_until"
+
+
+def replica_binds(urls: list[str]) -> dict[str, str]:
+    """Bind keys for ``SQLALCHEMY_BINDS`` from a list of replica URLs."""
+    return {f"{REPLICA_PREFIX}{index}": url for index, url in enumerate(urls)}
+
+
+def _replica_keys(engines) -> list[str]:
+    return [key for key in engines if isinstance(key, str) and key.startswith(REPLICA_PREFIX)]
+
+
+def _wants_replica() -> bool:
+    if not has_request_context():
+        return False
+    route = g.get("db_route")
+    if route is None:
+        sticky_until = flask_session.get(_STICKY_KEY, 0)
+        route = "replica" if request.method in READ_METHODS and sticky_until < time.time() else "primary"
+        g.db_route = route
+    return route == "replica"
+
+
+def read_from_primary() -> None:
+    """Send the rest of this request's reads to the primary."""
+    if has_request_context():
+        g.db_route = "primary"
+
+
+def use_primary(view: F) -> F:
+    """Decorate a view whose reads must never see replica lag."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        read_from_primary()
+        return view(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def routing_to_replica() -> bool:
+    """True when reads in the current request are being served by a replica."""
+    return _wants_replica() and bool(_replica_keys(current_app.extensions["sqlalchemy"].engines))
+
+
+class RoutingSession(Session):
+    """Session that sends eligible ``SELECT`` statements to a replica bind."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and isinstance(clause, Select)
+            and not self._flushing
+            and not self.info.get("wrote")
+            and _wants_replica()
+        ):
+            engines = self._db.engines
+            keys = _replica_keys(engines)
+            if keys:
+                key = g.get("db_replica")
+                if key not in keys:
+                    key = g.db_replica = random.choice(keys)
+                return engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _record_dml(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _stick_to_primary(session) -> None:
+    if not session.info.pop("wrote", False) or not has_request_context():
+        return
+    g.db_route = "primary"
+    sticky = current_app.config.get("DATABASE_REPLICA_STICKY_SECONDS", 0)
+    if sticky > 0:
+        flask_session[_STICKY_KEY] = time.time() + sticky
+
+
+def _sqlite_path(url: URL) -> str | None:
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return url.database
+
+
+def sync_sqlite_replicas(engines) -> list[str]:
+    """Copy a file-backed SQLite primary over each SQLite replica bind.
+
+    Lets replica routing be tried locally; returns the replica paths written.
+    """
+    source_path = _sqlite_path(engines[None].url)
+    if source_path is None:
+        raise ValueError("The primary database is not a file-backed SQLite database.")
+    written = []
+    with sqlite3.connect(source_path) as source:
+        for key in _replica_keys(engines):
+            path = _sqlite_path(engines[key].url)
+            if path is None:
+                continue
+            engines[key].dispose()
+            with sqlite3.connect(path) as target:
+                source.backup(target)
+            written.append(path)
+    return written
@@ -0,0 +1,155 @@
+"""Script revision history stored as line deltas between periodic snapshots.
+
+Each save records a revision. Every ``SCRIPT_SNAPSHOT_EVERY``-th one is a
+snapshot that points at the content blob the script already stores; the rest
+hold a zlib-compressed list of copy ranges and inserted text against the
+previous revision, so history grows with the size of the edits.
+"""
+from __future__ import annotations
+
+from difflib import SequenceMatcher, unified_diff
+import json
+import zlib
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+
+from .extensions import db
+from .models import Script, ScriptBlob, ScriptRevision
+
+_NO_NEWLINE = "\\ No newline at end of file"
+
+
+def encode_delta(old: str, new: str) -> bytes:
+    """Describe ``new`` as ``[start, end]`` line ranges copied from ``old`` and inserted strings."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops: list[list[int] | str] = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append("".join(new_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    old_lines = old.splitlines(keepends=True)
+    parts: list[str] = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts)
+
+
+def _latest_revision(script: Script) -> ScriptRevision | None:
+    if script.id is None:
+        return None
+    # Two saves of one script must not both number their revision from the same
+    # latest one. PostgreSQL holds the script row until commit; SQLite has no
+    # row locks, but the blob upsert in ``script.content`` already took its
+    # database-wide write lock, so the read below sees any earlier save.
+    db.session.execute(select(Script.id).where(Script.id == script.id).with_for_update())
+    return db.session.execute(
+        select(ScriptRevision)
+        .where(ScriptRevision.script_id == script.id)
+        .order_by(ScriptRevision.number.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def _snapshot(script: Script, number: int, text: str, digest: str, author_id: int | None) -> ScriptRevision:
+    blob = ScriptBlob.for_content(text, digest)
+    revision = ScriptRevision(
+        number=number,
+        base_number=number,
+        author_id=author_id,
+        content_hash=digest,
+        size=len(text.encode("utf-8")),
+        blob_digest=blob.digest,
+    )
+    script.revisions.append(revision)
+    return revision
+
+
+def save_content(script: Script, text: str, author_id: int | None = None) -> ScriptRevision | None:
+    """Set the script's content and record a revision when it changed."""
+    previous = script.content if script.content_hash else None
+    previous_digest = script.content_hash
+    script.content = text
+    digest = script.content_hash
+    if previous_digest == digest:
+        return None
+
+    latest = _latest_revision(script)
+    if previous is not None and (latest is None or latest.content_hash != previous_digest):
+        # History starts (or restarts after an out-of-band edit) from the old text.
+        latest = _snapshot(script, latest.number + 1 if latest else 1, previous, previous_digest, None)
+
+    number = latest.number + 1 if latest else 1
+    snapshot_every = current_app.config["SCRIPT_SNAPSHOT_EVERY"]
+    if latest is None or number - latest.base_number >= snapshot_every:
+        return _snapshot(script, number, text, digest, author_id)
+
+    revision = ScriptRevision(
+        number=number,
+        base_number=latest.base_number,
+        author_id=author_id,
+        content_hash=digest,
+        size=len(text.encode("utf-8")),
+        delta=encode_delta(previous, text),
+    )
+    script.revisions.append(revision)
+    return revision
+
+
+def revision_text(script_id: int, number: int) -> str | None:
+    """Rebuild one revision from its snapshot and at most ``SCRIPT_SNAPSHOT_EVERY - 1`` deltas."""
+    target = db.session.execute(
+        select(ScriptRevision.base_number).where(
+            ScriptRevision.script_id == script_id, ScriptRevision.number == number
+        )
+    ).scalar_one_or_none()
+    if target is None:
+        return None
+
+    chain = db.session.scalars(
+        select(ScriptRevision)
+        .where(
+            ScriptRevision.script_id == script_id,
+            ScriptRevision.number >= target,
+            ScriptRevision.number <= number,
+        )
+        .order_by(ScriptRevision.number)
+        .options(undefer(ScriptRevision.delta))
+    ).all()
+    snapshot, *deltas = chain
+    text = db.session.get(ScriptBlob, snapshot.blob_digest).text()
+    for revision in deltas:
+        text = apply_delta(text, revision.delta)
+    return text
+
+
+def _diff_lines(text: str) -> list[str]:
+    # Split on "\n" alone so "\r" and other line separators stay inside a line.
+    *lines, last = text.split("\n")
+    return [f"{line}\n" for line in lines] + ([last] if last else [])
+
+
+def diff_revisions(script_id: int, old_number: int, new_number: int) -> str | None:
+    """Return a unified diff between two revisions, or None if either is missing."""
+    old = revision_text(script_id, old_number)
+    new = revision_text(script_id, new_number)
+    if old is None or new is None:
+        return None
+    diff = unified_diff(
+        _diff_lines(old),
+        _diff_lines(new),
+        fromfile=f"revision {old_number}",
+        tofile=f"revision {new_number}",
+    )
+    # Only a final line can lack its newline; mark it the way diff(1) does.
+    return "".join(line if line.endswith("\n") else f"{line}\n{_NO_NEWLINE}\n" for line in diff)
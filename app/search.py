@@ -0,0 +1,188 @@
+"""Full-text search over script titles and bodies.
+
+Uses the database's own index: an FTS5 table on SQLite and a weighted
+``tsvector`` with a GIN index on PostgreSQL. Rows are kept in step with
+``scripts`` by mapper events on every insert, edit and delete, and queries
+never touch ``scripts.content``. Other databases get no search index.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+
+from flask_login import current_user
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, Connection, event, func, inspect, literal_column, or_, select, text
+from sqlalchemy.sql import column, table
+
+from .extensions import db
+from .markup import plain_text
+from .models import Script
+from .permissions import scope_to_workspace
+
+SEARCH_TABLE = "script_search"
+SNIPPET_WORDS = 24
+# Private-use markers wrap matches until the text is escaped for display.
+_MARK_START = "\ue000"
+_MARK_END = "\ue001"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+    "USING fts5(title, body, tokenize = 'porter unicode61')"
+)
+POSTGRES_DDL = (
+    f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+    "script_id INTEGER PRIMARY KEY REFERENCES scripts (id) ON DELETE CASCADE, "
+    "title TEXT NOT NULL, body TEXT NOT NULL, "
+    "document TSVECTOR GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+    ") STORED)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING gin (document)",
+)
+
+event.listen(Script.__table__, "after_create", DDL(SQLITE_DDL).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_DDL:
+    event.listen(Script.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+
+@dataclass(slots=True)
+class SearchResult:
+    script: Script
+    title: Markup
+    snippet: Markup
+    rank: float
+    editable: bool
+
+
+def _highlight(value: str | None) -> Markup:
+    escaped = str(escape(value or ""))
+    return Markup(escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>"))
+
+
+def _sqlite_query(terms: list[str]) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax; the
+    # last one matches as a prefix for search-as-you-type.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def index_script(connection: Connection, script_id: int, title: str, content: str) -> None:
+    """Write one script's row in the search index."""
+    body = plain_text(content)
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": script_id})
+        connection.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (rowid, title, body) VALUES (:id, :title, :body)"),
+            {"id": script_id, "title": title, "body": body},
+        )
+    elif dialect == "postgresql":
+        connection.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} (script_id, title, body) VALUES (:id, :title, :body) "
+                "ON CONFLICT (script_id) DO UPDATE SET title = excluded.title, body = excluded.body"
+            ),
+            {"id": script_id, "title": title, "body": body},
+        )
+
+
+def unindex_script(connection: Connection, script_id: int) -> None:
+    key = "rowid" if connection.dialect.name == "sqlite" else "script_id"
+    if connection.dialect.name in ("sqlite", "postgresql"):
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE {key} = :id"), {"id": script_id})
+
+
+@event.listens_for(Script, "after_insert")
+def _index_new_script(mapper, connection: Connection, target: Script) -> None:
+    index_script(connection, target.id, target.title, target.content)
+
+
+@event.listens_for(Script, "after_update")
+def _reindex_script(mapper, connection: Connection, target: Script) -> None:
+    state = inspect(target)
+    if state.attrs.title.history.has_changes() or state.attrs.content_hash.history.has_changes():
+        index_script(connection, target.id, target.title, target.content)
+
+
+@event.listens_for(Script, "after_delete")
+def _unindex_script(mapper, connection: Connection, target: Script) -> None:
+    unindex_script(connection, target.id)
+
+
+def reindex_all(batch_size: int = 200) -> int:
+    """Rebuild the index from every script, a batch per transaction."""
+    count = 0
+    last_id = 0
+    while True:
+        scripts = db.session.scalars(
+            select(Script).where(Script.id > last_id).order_by(Script.id).limit(batch_size)
+        ).all()
+        if not scripts:
+            return count
+        connection = db.session.connection()
+        for script in scripts:
+            index_script(connection, script.id, script.title, script.content)
+        db.session.commit()
+        count += len(scripts)
+        last_id = scripts[-1].id
+        db.session.expunge_all()
+
+
+def search_scripts(query: str, limit: int = 20) -> list[SearchResult]:
+    """Ranked matches for ``query`` among scripts in the user's active workspace."""
+    terms = _TOKEN.findall(query)
+    if not terms:
+        return []
+
+    dialect = db.session.get_bind(clause=select(Script)).dialect.name
+    if dialect == "sqlite":
+        index = table(SEARCH_TABLE, column("rowid"))
+        ref = literal_column(SEARCH_TABLE)
+        statement = (
+            select(
+                Script,
+                func.highlight(ref, 0, _MARK_START, _MARK_END).label("title_html"),
+                func.snippet(ref, 1, _MARK_START, _MARK_END, "…", SNIPPET_WORDS).label("snippet_html"),
+                func.bm25(ref, 10.0, 1.0).label("rank"),
+            )
+            .select_from(index)
+            .join(Script, Script.id == index.c.rowid)
+            .where(ref.op("MATCH")(_sqlite_query(terms)))
+            .order_by(literal_column("rank"))
+        )
+    elif dialect == "postgresql":
+        index = table(SEARCH_TABLE, column("script_id"), column("title"), column("body"), column("document"))
+        tsquery = func.websearch_to_tsquery("english", " ".join(terms))
+        options = f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords=8"
+        statement = (
+            select(
+                Script,
+                func.ts_headline("english", index.c.title, tsquery, "HighlightAll=true, " + options).label(
+                    "title_html"
+                ),
+                func.ts_headline("english", index.c.body, tsquery, options).label("snippet_html"),
+                (-func.ts_rank(index.c.document, tsquery)).label("rank"),
+            )
+            .select_from(index)
+            .join(Script, Script.id == index.c.script_id)
+            .where(index.c.document.op("@@")(tsquery))
+            .order_by(literal_column("rank"))
+        )
+    else:
+        return []
+
+    statement, membership = scope_to_workspace(statement, current_user.id)
+    editable = or_(Script.owner_id == current_user.id, membership.role == "admin").label("editable")
+    rows = db.session.execute(statement.add_columns(editable).limit(limit)).all()
+    return [
+        SearchResult(
+            script=row.Script,
+            title=_highlight(row.title_html),
+            snippet=_highlight(row.snippet_html),
+            rank=-row.rank,
+            editable=bool(row.editable),
+        )
+        for row in rows
+    ]
@@ -11,15 +11,10 @@
     }
 
     const socket = window.io('/control', { transports: ['websocket', 'polling'] });
-    socket.emit('join', { token });
     socket.on('error', (payload) => {
         console.error('Remote channel error:', payload?.message || payload);
     });
 
-    const send = (action, value) => {
-        socket.emit('control:update', { token, action, value });
-    };
-
     shell.querySelectorAll('[data-action]').forEach((button) => {
         button.addEventListener('click', (event) => {
             const action = event.currentTarget.dataset.action;
@@ -27,6 +22,12 @@
         });
     });
 
+    shell.querySelectorAll('[data-seek]').forEach((button) => {
+        button.addEventListener('click', (event) => {
+            send('seek', parseInt(event.currentTarget.dataset.seek, 10));
+        });
+    });
+
     shell.querySelectorAll('[data-channel]').forEach((input) => {
         const action = input.dataset.channel;
         if (input.type === 'range') {
@@ -45,7 +46,7 @@
         }
     });
 
-    socket.on('teleprompter:update', ({ action, value }) => {
+    const applyUpdate = (action, value) => {
         const target = shell.querySelector(`[data-channel="${action}"]`);
         if (!target) {
             return;
@@ -59,6 +60,11 @@
                 target.checked = value === true || value === 'true';
             }
         }
+    };
+
+    const send = window.PromptlyWire.connect(socket, token, applyUpdate);
+    socket.on('teleprompter:snapshot', (state) => {
+        Object.entries(state).forEach(([action, value]) => applyUpdate(action, value));
     });
 
     socket.on('teleprompter:end', () => {
@@ -18,8 +18,241 @@
     let lastTime = 0;
     let rafId;
 
+    // Pixels per second at speed 1.0; app/prompter/state.py uses the same figure.
+    const PIXELS_PER_SECOND = 120;
+    // In sync mode the playhead follows server keyframes instead of local state, so
+    // every display in the room derives the same position from the same clock.
+    const syncScroll = Boolean(token) && shell.dataset.syncScroll === 'true';
+    let clock;
+    let keyframe = null;
+    let anchorTop = 0;
+
     const clamp = (value, min, max) => Math.min(max, Math.max(min, value));
 
+    // Long scripts are paged in from the server: only a window of paragraphs lives in
+    // the DOM, with spacers standing in for the parts above and below it.
+    const paragraphsUrl = content.dataset.paragraphsUrl;
+    const paragraphTotal = parseInt(content.dataset.paragraphCount || '0', 10);
+    const chunkSize = Math.max(1, parseInt(content.dataset.chunkSize || '40', 10));
+    const windowLimit = chunkSize * 3;
+    const topSpacer = content.querySelector('[data-spacer="top"]');
+    const bottomSpacer = content.querySelector('[data-spacer="bottom"]');
+    const renderedParagraphs = () => content.querySelectorAll(':scope > p');
+    const virtualized = Boolean(paragraphsUrl && topSpacer && bottomSpacer)
+        && paragraphTotal > renderedParagraphs().length;
+
+    const chunkCache = new Map();
+    const chunkRequests = new Map();
+    let firstRendered = 0;
+    let lastRendered = renderedParagraphs().length;
+    let topOffset = 0;
+    let windowBusy = false;
+    let windowGeneration = 0;
+
+    if (virtualized) {
+        chunkCache.set(0, Array.from(renderedParagraphs(), (paragraph) => paragraph.outerHTML));
+    }
+
+    const fetchChunk = (start) => {
+        if (chunkCache.has(start)) {
+            return Promise.resolve(chunkCache.get(start));
+        }
+        if (!chunkRequests.has(start)) {
+            const request = fetch(`${paragraphsUrl}?start=${start}&count=${chunkSize}`, {
+                credentials: 'same-origin',
+                headers: { Accept: 'application/json' },
+            })
+                .then((response) => {
+                    if (!response.ok) {
+                        throw new Error(`Paragraph request failed (${response.status})`);
+                    }
+                    return response.json();
+                })
+                .then((payload) => {
+                    chunkCache.set(start, payload.paragraphs);
+                    return payload.paragraphs;
+                })
+                .finally(() => {
+                    chunkRequests.delete(start);
+                });
+            chunkRequests.set(start, request);
+        }
+        return chunkRequests.get(start);
+    };
+
+    const toFragment = (blocks) => {
+        const template = document.createElement('template');
+        template.innerHTML = blocks.join('');
+        return template.content;
+    };
+
+    const forgetDistantChunks = () => {
+        chunkCache.forEach((_, start) => {
+            if (start < firstRendered - windowLimit || start > lastRendered + windowLimit) {
+                chunkCache.delete(start);
+            }
+        });
+    };
+
+    const setTopOffset = (value) => {
+        topOffset = Math.max(0, value);
+        topSpacer.style.height = `${topOffset}px`;
+    };
+
+    const updateBottomSpacer = () => {
+        if (!virtualized) {
+            return;
+        }
+        const rendered = lastRendered - firstRendered;
+        const renderedHeight = bottomSpacer.offsetTop - topSpacer.offsetTop - topOffset;
+        const average = rendered > 0 ? renderedHeight / rendered : 0;
+        bottomSpacer.style.height = `${Math.round(average * (paragraphTotal - lastRendered))}px`;
+    };
+
+    const trimTop = () => {
+        while (lastRendered - firstRendered > windowLimit) {
+            const paragraphs = renderedParagraphs();
+            const removedHeight = paragraphs[chunkSize].offsetTop - paragraphs[0].offsetTop;
+            for (let index = 0; index < chunkSize; index += 1) {
+                paragraphs[index].remove();
+            }
+            setTopOffset(topOffset + removedHeight);
+            firstRendered += chunkSize;
+        }
+    };
+
+    const trimBottom = () => {
+        while (lastRendered - firstRendered > windowLimit) {
+            const paragraphs = renderedParagraphs();
+            const tail = lastRendered % chunkSize || chunkSize;
+            for (let index = paragraphs.length - tail; index < paragraphs.length; index += 1) {
+                paragraphs[index].remove();
+            }
+            lastRendered -= tail;
+        }
+    };
+
+    const shiftWindow = (start, apply) => {
+        const generation = windowGeneration;
+        windowBusy = true;
+        return fetchChunk(start)
+            .then((blocks) => {
+                if (generation === windowGeneration) {
+                    apply(blocks);
+                    updateBottomSpacer();
+                    forgetDistantChunks();
+                }
+            })
+            .finally(() => {
+                if (generation === windowGeneration) {
+                    windowBusy = false;
+                }
+            });
+    };
+
+    const appendChunk = () => shiftWindow(lastRendered, (blocks) => {
+        content.insertBefore(toFragment(blocks), bottomSpacer);
+        lastRendered = blocks.length ? lastRendered + blocks.length : paragraphTotal;
+        trimTop();
+    });
+
+    const prependChunk = () => shiftWindow(firstRendered - chunkSize, (blocks) => {
+        const anchor = topSpacer.nextElementSibling;
+        const before = anchor.offsetTop;
+        content.insertBefore(toFragment(blocks), anchor);
+        const inserted = anchor.offsetTop - before;
+        firstRendered -= chunkSize;
+        if (firstRendered === 0) {
+            // Absorb any drift between the spacer estimate and the real layout.
+            content.scrollTop += inserted - topOffset;
+            setTopOffset(0);
+        } else {
+            setTopOffset(topOffset - inserted);
+        }
+        trimBottom();
+    });
+
+    const ensureWindow = () => {
+        if (!virtualized || windowBusy) {
+            return;
+        }
+        const viewTop = content.scrollTop;
+        const viewBottom = viewTop + content.clientHeight;
+        const margin = content.clientHeight * 2;
+        let pending;
+        if (lastRendered < paragraphTotal && bottomSpacer.offsetTop - viewBottom < margin) {
+            pending = appendChunk();
+        } else if (firstRendered > 0 && viewTop - (topSpacer.offsetTop + topOffset) < margin) {
+            pending = prependChunk();
+        } else if (lastRendered < paragraphTotal) {
+            // Prefetch the next chunk ahead of the playhead.
+            fetchChunk(lastRendered).catch(() => {});
+            return;
+        }
+        if (pending) {
+            pending.then(ensureWindow).catch((error) => {
+                console.error('Unable to load script paragraphs:', error);
+            });
+        }
+    };
+
+    const resetWindow = () => {
+        content.scrollTop = 0;
+        if (!virtualized || firstRendered === 0) {
+            return;
+        }
+        windowGeneration += 1;
+        windowBusy = false;
+        shiftWindow(0, (blocks) => {
+            renderedParagraphs().forEach((paragraph) => paragraph.remove());
+            content.insertBefore(toFragment(blocks), bottomSpacer);
+            firstRendered = 0;
+            lastRendered = blocks.length;
+            setTopOffset(0);
+            content.scrollTop = 0;
+        }).catch((error) => {
+            console.error('Unable to load script paragraphs:', error);
+        });
+    };
+
+    const scrollToRendered = (index) => {
+        const target = renderedParagraphs()[index - firstRendered];
+        if (target) {
+            content.scrollTop = target.offsetTop - content.clientHeight / 4;
+        }
+    };
+
+    const seekToParagraph = (index) => {
+        if (!Number.isFinite(index) || index < 0 || index >= Math.max(paragraphTotal, lastRendered)) {
+            return Promise.resolve();
+        }
+        if (!virtualized || (index >= firstRendered && index < lastRendered)) {
+            scrollToRendered(index);
+            return Promise.resolve();
+        }
+        // Jump the window straight to the chunk holding the paragraph, estimating the
+        // height of everything above it from the paragraphs laid out so far.
+        const chunkStart = index - (index % chunkSize);
+        const rendered = lastRendered - firstRendered;
+        const average = rendered > 0 ? (bottomSpacer.offsetTop - topSpacer.offsetTop - topOffset) / rendered : 0;
+        windowGeneration += 1;
+        windowBusy = false;
+        return shiftWindow(chunkStart, (blocks) => {
+            renderedParagraphs().forEach((paragraph) => paragraph.remove());
+            content.insertBefore(toFragment(blocks), bottomSpacer);
+            firstRendered = chunkStart;
+            lastRendered = chunkStart + blocks.length;
+            setTopOffset(chunkStart > 0 ? Math.round(average * chunkStart) : 0);
+            scrollToRendered(index);
+        }).catch((error) => {
+            console.error('Unable to load script paragraphs:', error);
+        });
+    };
+
+    if (virtualized) {
+        content.addEventListener('scroll', ensureWindow, { passive: true });
+    }
+
     const setControlsVisibility = (visible) => {
         shell.classList.toggle('controls-hidden', !visible);
         if (controlsToggleBtn) {
@@ -67,8 +300,11 @@
             return;
         }
         const delta = (timestamp - lastTime) / 1000;
-        const pixels = delta * speed * 120;
-        content.scrollTop += pixels;
+        if (syncScroll && keyframe) {
+            content.scrollTop = syncedPosition();
+        } else {
+            content.scrollTop += delta * speed * PIXELS_PER_SECOND;
+        }
         lastTime = timestamp;
         rafId = window.requestAnimationFrame(tick);
     };
@@ -91,20 +327,61 @@
 
     const rewind = () => {
         stop();
-        content.scrollTop = 0;
+        resetWindow();
     };
 
-    shell.querySelector('[data-action="toggle"]').addEventListener('click', () => {
-        if (isPlaying) {
-            stop();
-            shell.querySelector('[data-action="toggle"]').textContent = 'Start';
-        } else {
+    const setPlaying = (playing) => {
+        if (playing) {
             start();
-            shell.querySelector('[data-action="toggle"]').textContent = 'Pause';
+        } else {
+            stop();
+        }
+        shell.querySelector('[data-action="toggle"]').textContent = playing ? 'Pause' : 'Start';
+    };
+
+    const syncedPosition = () => {
+        const elapsed = keyframe.started_at === null ? 0 : Math.max(0, clock.now() - keyframe.started_at) / 1000;
+        return anchorTop + keyframe.offset + elapsed * keyframe.speed * PIXELS_PER_SECOND;
+    };
+
+    const applyKeyframe = (frame, relayout = false) => {
+        const moved = relayout || !keyframe || keyframe.anchor !== frame.anchor;
+        keyframe = frame;
+        speed = frame.speed;
+        shell.querySelector('[data-control="speed"]').value = frame.speed;
+        const ready = moved ? seekToParagraph(frame.anchor) : Promise.resolve();
+        ready.then(() => {
+            if (keyframe !== frame) {
+                return;
+            }
+            if (moved) {
+                const anchor = renderedParagraphs()[frame.anchor - firstRendered];
+                anchorTop = frame.anchor > 0 && anchor
+                    ? Math.max(0, anchor.offsetTop - content.clientHeight / 4)
+                    : 0;
+            }
+            content.scrollTop = syncedPosition();
+            setPlaying(frame.started_at !== null);
+        });
+    };
+
+    shell.querySelector('[data-action="toggle"]').addEventListener('click', () => {
+        if (syncScroll) {
+            // Wait for the server's keyframe so every display starts together.
+            broadcastState('playing', !isPlaying);
+            return;
         }
+        setPlaying(!isPlaying);
+        broadcastState('playing', isPlaying);
     });
 
-    shell.querySelector('[data-action="rewind"]').addEventListener('click', rewind);
+    shell.querySelector('[data-action="rewind"]').addEventListener('click', () => {
+        if (syncScroll) {
+            broadcastState('rewind', true);
+            return;
+        }
+        rewind();
+    });
 
     controls.forEach((control) => {
         control.addEventListener('input', (event) => {
@@ -141,37 +418,59 @@
 
             updateStyles();
             if (resetScroll) {
-                content.scrollTop = 0;
+                resetWindow();
+                updateBottomSpacer();
+                if (syncScroll && keyframe) {
+                    applyKeyframe(keyframe, true);
+                }
             }
         });
     });
 
     setControlsVisibility(false);
     updateStyles();
+    if (virtualized) {
+        updateBottomSpacer();
+        ensureWindow();
+    }
 
+    let send;
     const broadcastState = (action, value) => {
-        if (!socket || !token) {
-            return;
+        if (send) {
+            send(action, value);
         }
-        socket.emit('control:update', { token, action, value });
     };
 
-    let socket;
+    const SYNCED_ACTIONS = new Set(['toggle', 'playing', 'rewind', 'seek', 'paragraph']);
+
     if (token) {
-        socket = window.io('/control', { transports: ['websocket', 'polling'] });
-        socket.emit('join', { token });
+        const socket = window.io('/control', { transports: ['websocket', 'polling'] });
+        if (syncScroll) {
+            clock = window.PromptlyWire.syncClock(socket);
+        }
         socket.on('error', (payload) => {
             console.error('Remote channel error:', payload?.message || payload);
         });
 
-        socket.on('teleprompter:update', ({ action, value }) => {
+        const applyUpdate = (action, value) => {
+            if (syncScroll && SYNCED_ACTIONS.has(action)) {
+                // Motion arrives as a keyframe right behind these updates.
+                return;
+            }
             switch (action) {
                 case 'toggle':
-                    shell.querySelector('[data-action="toggle"]').click();
+                    setPlaying(!isPlaying);
+                    break;
+                case 'playing':
+                    setPlaying(value === true || value === 'true');
                     break;
                 case 'rewind':
                     rewind();
                     break;
+                case 'seek':
+                case 'paragraph':
+                    seekToParagraph(parseInt(value, 10));
+                    break;
                 case 'speed':
                     shell.querySelector('[data-control="speed"]').value = value;
                     speed = parseFloat(value);
@@ -202,9 +501,24 @@
                 case 'theme':
                     shell.querySelector('[data-control="theme"]').value = value;
                     break;
+                case 'keyframe':
+                    if (syncScroll) {
+                        applyKeyframe(value);
+                    }
+                    break;
                 default:
                     break;
             }
+        };
+
+        send = window.PromptlyWire.connect(socket, token, (action, value) => {
+            applyUpdate(action, value);
+            updateStyles();
+        });
+
+        // Sent once on join with everything the room has changed so far.
+        socket.on('teleprompter:snapshot', (state) => {
+            Object.entries(state).forEach(([action, value]) => applyUpdate(action, value));
             updateStyles();
         });
 
@@ -0,0 +1,201 @@
+// Compact binary control frames; mirrors app/prompter/wire.py.
+(function () {
+    const ACTIONS = [
+        'toggle',
+        'rewind',
+        'seek',
+        'speed',
+        'font-size',
+        'line-height',
+        'theme',
+        'mirror',
+        'uppercase',
+        'guidelines',
+        'playing',
+        'keyframe',
+    ];
+    const VALUE_TYPES = {
+        toggle: null,
+        rewind: null,
+        seek: 'int',
+        speed: 'float',
+        'font-size': 'int',
+        'line-height': 'int',
+        theme: 'string',
+        mirror: 'bool',
+        uppercase: 'bool',
+        guidelines: 'bool',
+        playing: 'bool',
+        keyframe: 'keyframe',
+    };
+    const TYPE_NONE = 0;
+    const TYPE_FALSE = 1;
+    const TYPE_TRUE = 2;
+    const TYPE_INT = 3;
+    const TYPE_FLOAT = 4;
+    const TYPE_STRING = 5;
+    const TYPE_KEYFRAME = 6;
+
+    const encode = (action, value) => {
+        const code = ACTIONS.indexOf(action) + 1;
+        if (!code) {
+            return null;
+        }
+        const kind = VALUE_TYPES[action];
+        if (kind === null) {
+            return new Uint8Array([code, TYPE_NONE]);
+        }
+        if (kind === 'bool') {
+            const flag = value === true || value === 'true';
+            return new Uint8Array([code, flag ? TYPE_TRUE : TYPE_FALSE]);
+        }
+        if (kind === 'string') {
+            const body = new TextEncoder().encode(String(value));
+            const frame = new Uint8Array(body.length + 2);
+            frame.set([code, TYPE_STRING]);
+            frame.set(body, 2);
+            return frame;
+        }
+        if (kind === 'keyframe') {
+            const view = new DataView(new ArrayBuffer(22));
+            view.setUint8(0, code);
+            view.setUint8(1, TYPE_KEYFRAME);
+            view.setInt32(2, value.anchor);
+            view.setFloat32(6, value.offset);
+            view.setFloat32(10, value.speed);
+            view.setFloat64(14, value.started_at === null ? NaN : value.started_at);
+            return new Uint8Array(view.buffer);
+        }
+        const number = Number(value);
+        if (!Number.isFinite(number)) {
+            return null;
+        }
+        const view = new DataView(new ArrayBuffer(6));
+        view.setUint8(0, code);
+        if (kind === 'int') {
+            view.setUint8(1, TYPE_INT);
+            view.setInt32(2, Math.trunc(number));
+        } else {
+            view.setUint8(1, TYPE_FLOAT);
+            view.setFloat32(2, number);
+        }
+        return new Uint8Array(view.buffer);
+    };
+
+    const decode = (buffer) => {
+        const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+        if (bytes.length < 2 || bytes[0] < 1 || bytes[0] > ACTIONS.length) {
+            return null;
+        }
+        const action = ACTIONS[bytes[0] - 1];
+        const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+        switch (bytes[1]) {
+            case TYPE_NONE:
+                return { action, value: null };
+            case TYPE_FALSE:
+            case TYPE_TRUE:
+                return { action, value: bytes[1] === TYPE_TRUE };
+            case TYPE_INT:
+                return bytes.length === 6 ? { action, value: view.getInt32(2) } : null;
+            case TYPE_FLOAT:
+                return bytes.length === 6
+                    ? { action, value: Math.round(view.getFloat32(2) * 10000) / 10000 }
+                    : null;
+            case TYPE_STRING:
+                return { action, value: new TextDecoder().decode(bytes.subarray(2)) };
+            case TYPE_KEYFRAME: {
+                if (bytes.length !== 22) {
+                    return null;
+                }
+                const startedAt = view.getFloat64(14);
+                return {
+                    action,
+                    value: {
+                        anchor: view.getInt32(2),
+                        offset: view.getFloat32(6),
+                        speed: Math.round(view.getFloat32(10) * 10000) / 10000,
+                        started_at: Number.isNaN(startedAt) ? null : startedAt,
+                    },
+                };
+            }
+            default:
+                return null;
+        }
+    };
+
+    // Joins the control room, asking for binary frames, and calls back with a
+    // `send(action, value)` that uses whichever encoding the server agreed to.
+    const connect = (socket, token, onUpdate) => {
+        let encoding = 'json';
+        // Rooms do not survive a reconnect, so join again on every connect.
+        socket.on('connect', () => {
+            socket.emit('join', { token, encoding: 'binary' });
+        });
+        socket.on('joined', (payload) => {
+            encoding = payload?.encoding || 'json';
+        });
+        socket.on('teleprompter:update', ({ action, value, ack }) => {
+            if (ack !== undefined) {
+                socket.emit('control:ack', ack);
+            }
+            onUpdate(action, value);
+        });
+        socket.on('teleprompter:frame', (frame, ack) => {
+            if (ack !== undefined) {
+                socket.emit('control:ack', ack);
+            }
+            const message = decode(frame);
+            if (message) {
+                onUpdate(message.action, message.value);
+            }
+        });
+        return (action, value) => {
+            const frame = encoding === 'binary' ? encode(action, value) : null;
+            if (frame) {
+                socket.emit('control:frame', frame);
+            } else {
+                socket.emit('control:update', { token, action, value });
+            }
+        };
+    };
+
+    // Estimates the offset between this clock and the server's from a burst of
+    // pings, keeping the sample with the shortest round trip (NTP style).
+    const syncClock = (socket, { samples = 5, spacing = 200, every = 60000 } = {}) => {
+        let offset = 0;
+        let bestRoundTrip = Infinity;
+
+        const probe = () => {
+            const sentAt = Date.now();
+            socket.emit('clock:ping', sentAt, (reply) => {
+                const receivedAt = Date.now();
+                const roundTrip = receivedAt - sentAt;
+                if (reply && roundTrip <= bestRoundTrip) {
+                    bestRoundTrip = roundTrip;
+                    offset = reply.server_time - (sentAt + receivedAt) / 2;
+                }
+            });
+        };
+
+        const burst = () => {
+            // Let a fresh burst replace samples taken on an older, possibly slower path.
+            bestRoundTrip = Infinity;
+            for (let index = 0; index < samples; index += 1) {
+                window.setTimeout(probe, index * spacing);
+            }
+        };
+
+        socket.on('connect', burst);
+        window.setInterval(() => {
+            if (socket.connected) {
+                burst();
+            }
+        }, every);
+
+        return {
+            now: () => Date.now() + offset,
+        };
+    };
+
+    window.PromptlyWire = { encode, decode, connect, syncClock };
+})();
@@ -0,0 +1,219 @@
+"""Throughput and memory benchmarks for the markup renderer and HTML importer.
+
+Run from the repository root::
+
+    python -m benchmarks.markup --output bench.json
+    python -m benchmarks.markup --baseline benchmarks/baseline.json --threshold 0.2
+
+Synthetic scripts are generated deterministically so runs on the same machine
+are comparable. With ``--baseline`` the run exits non-zero when any case is
+slower, or uses more peak memory, than the baseline by more than the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from app.markup import MARKUP_VERSION, render_script
+
+KB = 1024
+MB = 1024 * KB
+DEFAULT_SIZES = (KB, 10 * KB, 100 * KB, MB, 10 * MB, 50 * MB)
+QUICK_SIZES = (KB, 10 * KB, 100 * KB, MB)
+
+_WORDS = (
+    "tonight we open with the latest from city hall where council members voted "
+    "on the new transit budget after hours of debate residents packed the chamber "
+    "to speak for and against the proposal which would expand bus service across "
+    "the east side while raising fares for weekend riders our reporter has more "
+    "weather forecast sunny skies later this week with temperatures climbing"
+).split()
+_CUES = ("Camera 2", "Roll VT", "Look left", "Graphic up", "Slow down", "Smile")
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    size: int
+    seconds: float
+    throughput_mb_s: float
+    peak_memory_mb: float
+
+
+def _paragraph(rng: random.Random) -> str:
+    words = []
+    for _ in range(rng.randint(40, 120)):
+        word = rng.choice(_WORDS)
+        if rng.random() < 0.02:
+            word = f"**{word}**"
+        words.append(word)
+    if rng.random() < 0.35:
+        words.insert(rng.randrange(len(words)), f"[[{rng.choice(_CUES)}]]")
+    if rng.random() < 0.2:
+        words.append(f"{{{{pause:{rng.choice(('1', '2', '1.5', '3'))}}}}}")
+    return " ".join(words)
+
+
+def generate_script(size: int, *, seed: int = 1234) -> str:
+    """Build a script of roughly ``size`` characters with realistic markup density."""
+    rng = random.Random(seed)
+    pool = [_paragraph(rng) for _ in range(256)]
+    paragraphs = []
+    total = 0
+    while total < size:
+        paragraph = rng.choice(pool)
+        paragraphs.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+
+def generate_html(size: int, *, seed: int = 1234) -> str:
+    """Build an HTML export of roughly ``size`` characters, as Drive would return it."""
+    script = generate_script(size, seed=seed)
+    blocks = []
+    for paragraph in script.split("\n\n"):
+        paragraph = paragraph.replace("**", "")
+        blocks.append(f"<p class=\"c1\"><span class=\"c2\">{paragraph}</span></p>")
+    return "<html><head><style>.c1{margin:0}</style></head><body>" + "".join(blocks) + "</body></html>"
+
+
+def _plain_text() -> Callable[[str], str]:
+    from app.services.google_drive import GoogleDriveService
+
+    return GoogleDriveService._to_plain_text
+
+
+def _measure(name: str, func: Callable[[str], object], payload: str, min_time: float) -> Result:
+    timings = []
+    started = time.perf_counter()
+    while not timings or (time.perf_counter() - started < min_time and len(timings) < 1000):
+        begin = time.perf_counter()
+        func(payload)
+        timings.append(time.perf_counter() - begin)
+    best = min(timings)
+
+    tracemalloc.start()
+    try:
+        func(payload)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    size = len(payload)
+    return Result(
+        name=name,
+        size=size,
+        seconds=round(best, 6),
+        throughput_mb_s=round(size / MB / best, 3) if best else 0.0,
+        peak_memory_mb=round(peak / MB, 3),
+    )
+
+
+def run(sizes: tuple[int, ...], *, html_max_size: int, min_time: float) -> list[Result]:
+    results = []
+    to_plain_text = _plain_text()
+    for size in sizes:
+        results.append(_measure("render_script", render_script, generate_script(size), min_time))
+        _report(results[-1])
+        if size <= html_max_size:
+            results.append(_measure("to_plain_text", to_plain_text, generate_html(size), min_time))
+            _report(results[-1])
+    return results
+
+
+def _report(result: Result) -> None:
+    print(
+        f"{result.name:<15} {result.size / KB:>10.0f} KB  {result.seconds:>10.6f}s  "
+        f"{result.throughput_mb_s:>8.2f} MB/s  peak {result.peak_memory_mb:>8.2f} MB",
+        flush=True,
+    )
+
+
+def compare(results: list[Result], baseline: dict[str, object], threshold: float) -> list[str]:
+    """Return a message for every case that regressed beyond ``threshold``."""
+    previous = {(entry["name"], entry["size"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        entry = previous.get((result.name, result.size))
+        if not entry:
+            continue
+        if result.throughput_mb_s < entry["throughput_mb_s"] * (1 - threshold):
+            regressions.append(
+                f"{result.name} @ {result.size} B: throughput {result.throughput_mb_s} MB/s "
+                f"vs baseline {entry['throughput_mb_s']} MB/s"
+            )
+        if result.peak_memory_mb > entry["peak_memory_mb"] * (1 + threshold):
+            regressions.append(
+                f"{result.name} @ {result.size} B: peak memory {result.peak_memory_mb} MB "
+                f"vs baseline {entry['peak_memory_mb']} MB"
+            )
+    return regressions
+
+
+def _parse_sizes(value: str) -> tuple[int, ...]:
+    units = {"kb": KB, "mb": MB, "b": 1}
+    sizes = []
+    for token in value.split(","):
+        token = token.strip().lower()
+        for suffix, factor in units.items():
+            if token.endswith(suffix):
+                sizes.append(int(float(token[: -len(suffix)]) * factor))
+                break
+        else:
+            sizes.append(int(token))
+    return tuple(sizes)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_parse_sizes, help="comma separated sizes, e.g. 1kb,1mb,50mb")
+    parser.add_argument("--quick", action="store_true", help="only run sizes up to 1 MB")
+    parser.add_argument(
+        "--html-max-size",
+        type=_parse_sizes,
+        default=(10 * MB,),
+        help="largest size to benchmark HTML conversion at (default 10mb)",
+    )
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each case")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    results = run(sizes, html_max_size=args.html_max_size[0], min_time=args.min_time)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "markup_version": MARKUP_VERSION,
+        },
+        "results": [asdict(result) for result in results],
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
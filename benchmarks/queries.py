@@ -0,0 +1,156 @@
+"""SQL statement counts for the main authenticated pages.
+
+Run from the repository root::
+
+    python -m benchmarks.queries
+    python -m benchmarks.queries --output queries.json
+
+A user with several organizations, integrations and invites is seeded into an
+in-memory database, then each page is requested once and the statements it
+sends are counted with ``app.querystats.count_queries``. The run exits non-zero
+when any page issues more statements than its budget in ``BUDGETS``, so savings
+cannot silently regress.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+import json
+import sys
+
+# Statements allowed per page, including loading the signed-in user.
+BUDGETS = {
+    "dashboard": 2,
+    "dashboard (organization)": 4,
+    "prompter": 2,
+    "prompter paragraphs": 2,
+    "api script": 2,
+    "settings": 2,
+    "organizations": 2,
+}
+# Page name, path template filled from the seeded ids, and whether the seeded
+# organization is the active workspace.
+PAGES = (
+    ("dashboard", "/", False),
+    ("prompter", "/prompter/{script}", False),
+    ("prompter paragraphs", "/prompter/{script}/paragraphs", False),
+    ("api script", "/api/scripts/{script}", False),
+    ("settings", "/settings", False),
+    ("organizations", "/organizations", False),
+    ("dashboard (organization)", "/", True),
+)
+EMAIL = "queries@example.com"
+PASSWORD = "queries-password"
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    path: str
+    status: int
+    queries: int
+    budget: int
+
+
+def seed(app, organizations: int = 5, scripts: int = 20) -> dict[str, int]:
+    """Create the budget user's data and return the ids the page paths need."""
+    from app.extensions import db
+    from app.models import Organization, OrganizationInvite, OrgMembership, Script, User, UserIntegration
+
+    with app.app_context():
+        db.create_all()
+        user = User(email=EMAIL, name="Query budget")
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserIntegration(user_id=user.id, provider="nextcloud"))
+        first_org = None
+        for index in range(organizations):
+            organization = Organization(name=f"Org {index}", slug=f"org-{index}", created_by=user)
+            db.session.add(organization)
+            db.session.flush()
+            first_org = first_org or organization
+            db.session.add(OrgMembership(organization_id=organization.id, user_id=user.id, role="admin"))
+            db.session.add(
+                OrganizationInvite(
+                    organization_id=organization.id,
+                    code=OrganizationInvite.issue_code(),
+                    created_by=user,
+                )
+            )
+        script = None
+        for index in range(scripts):
+            script = Script(title=f"Script {index}", content="Good evening.\n\nTonight's headlines.", owner_id=user.id)
+            db.session.add(script)
+            db.session.add(
+                Script(
+                    title=f"Shared {index}",
+                    content="Shared rundown.",
+                    owner_id=user.id,
+                    organization_id=first_org.id if first_org else None,
+                )
+            )
+        db.session.commit()
+        return {"script": script.id, "organization": first_org.id if first_org else 0}
+
+
+def sign_in(app):
+    """Return a test client signed in as the seeded user."""
+    client = app.test_client()
+    response = client.post("/auth/login", data={"email": EMAIL, "password": PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError("could not sign in the seeded user")
+    return client
+
+
+def open_page(client, ids: dict[str, int], path: str, in_organization: bool):
+    """Request one of ``PAGES`` with the matching workspace active."""
+    with client.session_transaction() as session:
+        if in_organization:
+            session["active_org_id"] = ids["organization"]
+        else:
+            session.pop("active_org_id", None)
+    return client.get(path.format(**ids))
+
+
+def run(organizations: int = 5, scripts: int = 20) -> list[Result]:
+    from app import create_app
+    from app.querystats import count_queries
+
+    app = create_app("testing")
+    app.config["WTF_CSRF_ENABLED"] = False
+    ids = seed(app, organizations, scripts)
+    client = sign_in(app)
+
+    results = []
+    for name, path, in_organization in PAGES:
+        with count_queries() as stats:
+            response = open_page(client, ids, path, in_organization)
+        results.append(Result(name, path.format(**ids), response.status_code, stats.count, BUDGETS[name]))
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--organizations", type=int, default=5, help="organizations the user belongs to")
+    parser.add_argument("--scripts", type=int, default=20, help="personal and shared scripts to seed")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = run(args.organizations, args.scripts)
+    failed = False
+    print(f"{'page':<26} {'status':>6} {'queries':>8} {'budget':>7}")
+    for result in results:
+        over = result.queries > result.budget or result.status >= 400
+        failed = failed or over
+        marker = "  OVER" if over else ""
+        print(f"{result.name:<26} {result.status:>6} {result.queries:>8} {result.budget:>7}{marker}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump([asdict(result) for result in results], handle, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,482 @@
+"""Load test for the ``/control`` Socket.IO namespace.
+
+Run from the repository root::
+
+    python -m benchmarks.realtime --rooms 20 --prompters 3 --duration 30 --output load.json
+    python -m benchmarks.realtime --rooms 20 --prompters 3 --baseline load.json
+
+The run seeds a throwaway SQLite database with one remote control session per
+room and starts ``realtime.py`` against it on a free local port. It connects
+one remote and ``--prompters`` prompter clients to every room. The remotes
+replay a seeded mix of slider drags, seeks and play/pause toggles. The report
+covers:
+
+- delivery latency percentiles;
+- delivered messages per second;
+- discrete messages that never arrived;
+- prompters left on a stale slider value;
+- the server's CPU time and resident memory;
+- how many client acks the server's delivery latency histogram recorded.
+
+Slider values collapsed by server-side coalescing are reported separately,
+not counted as drops. With ``--baseline`` the run exits non-zero when p95
+latency or throughput regresses beyond the threshold, or when messages are
+dropped. Every run exits non-zero when the server recorded no acks, since
+clients in either encoding echo the sampled ids the way the browser does.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.request import Request, urlopen
+
+DISCRETE_ACTIONS = ("seek", "toggle")
+SLIDER_STEPS = 10
+SLIDER_STEP_SECONDS = 0.03
+METRICS_TOKEN = "load-test"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(slots=True)
+class Report:
+    rooms: int
+    prompters: int
+    clients: int
+    duration: float
+    encoding: str
+    sent: int
+    delivered: int
+    delivered_per_second: float
+    coalesced: int
+    dropped: int
+    stale_sliders: int
+    keyframes: int
+    latency_p50_ms: float | None
+    latency_p95_ms: float | None
+    latency_p99_ms: float | None
+    latency_max_ms: float | None
+    server_cpu_seconds: float | None
+    server_cpu_percent: float | None
+    server_rss_mb: float | None
+    server_peak_rss_mb: float | None
+    server_acks: int | None
+
+
+class _Room:
+    """Counters shared by the clients of one room; updated from client threads."""
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+        self.sent_at: dict[tuple[str, object], float] = {}
+        self.sent = {"seek": 0, "toggle": 0, "speed": 0}
+        self.last_speed: object = None
+        self.lock = threading.Lock()
+
+
+class _Client:
+    """One simulated prompter or remote connected to a room."""
+
+    def __init__(self, url: str, room: _Room, encoding: str, stats: "_Stats") -> None:
+        import socketio
+
+        self.room = room
+        self.encoding = encoding
+        self.stats = stats
+        self.joined = threading.Event()
+        self.last_speed: object = None
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on("joined", self._on_joined, namespace="/control")
+        self.sio.on("teleprompter:update", self._on_update, namespace="/control")
+        self.sio.on("teleprompter:frame", self._on_frame, namespace="/control")
+        self.sio.connect(url, namespaces=["/control"], transports=["websocket"])
+        self.sio.emit("join", {"token": room.token, "encoding": encoding}, namespace="/control")
+
+    def send(self, action: str, value: object) -> None:
+        if self.encoding == "binary":
+            from app.prompter.wire import encode_frame
+
+            self.sio.emit("control:frame", encode_frame(action, value), namespace="/control")
+        else:
+            self.sio.emit(
+                "control:update",
+                {"token": self.room.token, "action": action, "value": value},
+                namespace="/control",
+            )
+
+    def close(self) -> None:
+        self.sio.disconnect()
+
+    def _on_joined(self, payload: dict[str, object]) -> None:
+        self.joined.set()
+
+    def _on_frame(self, frame: bytes, ack: int | None = None) -> None:
+        from app.prompter.wire import decode_frame
+
+        payload = dict(zip(("action", "value"), decode_frame(frame)))
+        if ack is not None:
+            payload["ack"] = ack
+        self._on_update(payload)
+
+    def _on_update(self, payload: dict[str, object]) -> None:
+        received_at = time.perf_counter()
+        if "ack" in payload:
+            self.sio.emit("control:ack", payload["ack"], namespace="/control")
+        action = payload.get("action")
+        value = payload.get("value")
+        if action == "keyframe":
+            self.stats.record(keyframe=True)
+            return
+        if action == "speed":
+            self.last_speed = value
+        sent_at = self.room.sent_at.get((action, value)) if action != "toggle" else None
+        latency = (received_at - sent_at) * 1000 if sent_at is not None else None
+        self.stats.record(action=action, latency=latency)
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.received = {"seek": 0, "toggle": 0, "speed": 0}
+        self.keyframes = 0
+
+    def record(self, action: str | None = None, latency: float | None = None, keyframe: bool = False) -> None:
+        with self.lock:
+            if keyframe:
+                self.keyframes += 1
+                return
+            if action in self.received:
+                self.received[action] += 1
+            if latency is not None:
+                self.latencies.append(latency)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def seed_database(database_url: str, rooms: int) -> list[str]:
+    """Create the schema and one script with an active remote session per room."""
+    os.environ["DATABASE_URL"] = database_url
+    from app import create_app
+    from app.extensions import db
+    from app.models import RemoteControlSession, Script, User
+
+    app = create_app("production")
+    with app.app_context():
+        db.create_all()
+        owner = User(email="loadtest@example.com", name="Load test")
+        owner.set_password("loadtest-password")
+        db.session.add(owner)
+        db.session.flush()
+        tokens = []
+        for index in range(rooms):
+            script = Script(title=f"Load test {index}", content="Good evening.\n\nTonight's headlines.", owner_id=owner.id)
+            db.session.add(script)
+            db.session.flush()
+            token = RemoteControlSession.issue_token()
+            db.session.add(RemoteControlSession(script_id=script.id, control_token=token, is_active=True))
+            tokens.append(token)
+        db.session.commit()
+    return tokens
+
+
+def start_server(database_url: str, port: int, env_overrides: dict[str, str]) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        FLASK_ENV="production",
+        PORT=str(port),
+        HOST="127.0.0.1",
+        METRICS_TOKEN=METRICS_TOKEN,
+    )
+    env.update(env_overrides)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "realtime.py")],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited early:\n{server.stderr.read().decode(errors='replace')}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start listening within 20 seconds")
+
+
+def server_acks(url: str) -> int | None:
+    """Samples in the server's delivery latency histogram, read from ``/metrics``."""
+    request = Request(f"{url}/metrics", headers={"Authorization": f"Bearer {METRICS_TOKEN}"})
+    try:
+        with urlopen(request, timeout=5) as response:
+            body = response.read().decode("utf-8")
+    except OSError:
+        return None
+    for line in body.splitlines():
+        if line.startswith("promptly_control_delivery_seconds_count "):
+            return int(line.split()[1])
+    return None
+
+
+def _cpu_seconds(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/stat", encoding="ascii") as handle:
+            fields = handle.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _memory_mb(pid: int) -> tuple[float | None, float | None]:
+    values: dict[str, float] = {}
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as handle:
+            for line in handle:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        return None, None
+    return values.get("VmRSS"), values.get("VmHWM")
+
+
+def _drive_room(remote: _Client, room: _Room, rng: random.Random, rate: float, stop: threading.Event) -> None:
+    """Replay operator gestures: mostly slider drags, some seeks and toggles."""
+    seq = 0
+    while not stop.is_set():
+        roll = rng.random()
+        if roll < 0.6:
+            for _ in range(SLIDER_STEPS):
+                seq += 1
+                value = round(0.2 + (seq % 3800) / 1000, 3)
+                with room.lock:
+                    room.sent_at[("speed", value)] = time.perf_counter()
+                    room.sent["speed"] += 1
+                    room.last_speed = value
+                remote.send("speed", value)
+                if stop.wait(SLIDER_STEP_SECONDS):
+                    return
+        else:
+            seq += 1
+            action, value = ("seek", seq) if roll < 0.85 else ("toggle", True)
+            with room.lock:
+                room.sent_at[(action, value)] = time.perf_counter()
+                room.sent[action] += 1
+            remote.send(action, value)
+        if stop.wait(rng.expovariate(rate)):
+            return
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return round(values[index], 3)
+
+
+def run(
+    rooms: int,
+    prompters: int,
+    duration: float,
+    rate: float,
+    encoding: str,
+    seed: int,
+    env_overrides: dict[str, str],
+) -> Report:
+    with tempfile.TemporaryDirectory(prefix="promptly-load-") as workdir:
+        database_url = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+        tokens = seed_database(database_url, rooms)
+        port = _free_port()
+        server = start_server(database_url, port, env_overrides)
+        url = f"http://127.0.0.1:{port}"
+        stats = _Stats()
+        clients: list[_Client] = []
+        try:
+            room_states = [_Room(token) for token in tokens]
+            remotes = []
+            for room in room_states:
+                remotes.append(_Client(url, room, encoding, stats))
+                clients.append(remotes[-1])
+                clients.extend(_Client(url, room, encoding, stats) for _ in range(prompters))
+            for client in clients:
+                if not client.joined.wait(10):
+                    raise RuntimeError("A client did not join its room within 10 seconds")
+            prompter_clients = [client for client in clients if client not in remotes]
+
+            cpu_before = _cpu_seconds(server.pid)
+            stop = threading.Event()
+            rng = random.Random(seed)
+            drivers = [
+                threading.Thread(
+                    target=_drive_room,
+                    args=(remote, room, random.Random(rng.random()), rate, stop),
+                    daemon=True,
+                )
+                for remote, room in zip(remotes, room_states)
+            ]
+            started = time.perf_counter()
+            for driver in drivers:
+                driver.start()
+            time.sleep(duration)
+            stop.set()
+            for driver in drivers:
+                driver.join()
+            elapsed = time.perf_counter() - started
+            # Let coalesced values and in-flight messages land.
+            time.sleep(1.0)
+            cpu_after = _cpu_seconds(server.pid)
+            rss, peak_rss = _memory_mb(server.pid)
+            acks = server_acks(url)
+        finally:
+            for client in clients:
+                try:
+                    client.close()
+                except Exception:  # noqa: BLE001 - best effort teardown
+                    pass
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    sent = sum(sum(room.sent.values()) for room in room_states)
+    expected_discrete = sum(room.sent[action] for room in room_states for action in DISCRETE_ACTIONS) * prompters
+    received_discrete = sum(stats.received[action] for action in DISCRETE_ACTIONS)
+    expected_speed = sum(room.sent["speed"] for room in room_states) * prompters
+    stale = sum(1 for client in prompter_clients if client.last_speed != client.room.last_speed)
+    delivered = sum(stats.received.values())
+    latencies = sorted(stats.latencies)
+    cpu = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+
+    return Report(
+        rooms=rooms,
+        prompters=prompters,
+        clients=len(clients),
+        duration=round(elapsed, 3),
+        encoding=encoding,
+        sent=sent,
+        delivered=delivered,
+        delivered_per_second=round(delivered / elapsed, 1),
+        coalesced=max(expected_speed - stats.received["speed"], 0),
+        dropped=max(expected_discrete - received_discrete, 0),
+        stale_sliders=stale,
+        keyframes=stats.keyframes,
+        latency_p50_ms=_percentile(latencies, 0.50),
+        latency_p95_ms=_percentile(latencies, 0.95),
+        latency_p99_ms=_percentile(latencies, 0.99),
+        latency_max_ms=round(latencies[-1], 3) if latencies else None,
+        server_cpu_seconds=round(cpu, 3) if cpu is not None else None,
+        server_cpu_percent=round(cpu / elapsed * 100, 1) if cpu is not None else None,
+        server_rss_mb=round(rss, 1) if rss is not None else None,
+        server_peak_rss_mb=round(peak_rss, 1) if peak_rss is not None else None,
+        server_acks=acks,
+    )
+
+
+def compare(report: Report, baseline: dict[str, object], threshold: float) -> list[str]:
+    """Return a message for every metric that regressed beyond ``threshold``."""
+    previous = baseline.get("report", {})
+    regressions = []
+    if report.dropped or report.stale_sliders:
+        regressions.append(f"{report.dropped} dropped messages, {report.stale_sliders} stale sliders")
+    if previous.get("latency_p95_ms") and report.latency_p95_ms is not None:
+        if report.latency_p95_ms > previous["latency_p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"p95 latency {report.latency_p95_ms} ms vs baseline {previous['latency_p95_ms']} ms"
+            )
+    if previous.get("delivered_per_second"):
+        if report.delivered_per_second < previous["delivered_per_second"] * (1 - threshold):
+            regressions.append(
+                f"throughput {report.delivered_per_second} msg/s "
+                f"vs baseline {previous['delivered_per_second']} msg/s"
+            )
+    return regressions
+
+
+def _print_report(report: Report) -> None:
+    for key, value in asdict(report).items():
+        print(f"{key:<22} {value}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=10, help="number of remote control rooms")
+    parser.add_argument("--prompters", type=int, default=2, help="prompter clients per room")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of traffic to replay")
+    parser.add_argument("--rate", type=float, default=2.0, help="operator gestures per second per room")
+    parser.add_argument("--encoding", choices=("json", "binary"), default="json")
+    parser.add_argument("--coalesce-interval", help="override CONTROL_COALESCE_INTERVAL on the server")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression ratio")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.coalesce_interval is not None:
+        overrides["CONTROL_COALESCE_INTERVAL"] = args.coalesce_interval
+
+    report = run(
+        args.rooms,
+        args.prompters,
+        args.duration,
+        args.rate,
+        args.encoding,
+        args.seed,
+        overrides,
+    )
+    _print_report(report)
+
+    payload = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "rate": args.rate,
+            "coalesce_interval": args.coalesce_interval,
+        },
+        "report": asdict(report),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+
+    if report.delivered and not report.server_acks:
+        print("ERROR the server recorded no delivery latency samples", file=sys.stderr)
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(report, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 """Convenience entry-point for running the application with Socket.IO."""
 from app import create_app
 from app.extensions import socketio
+from app.prompter.reaper import start_session_reaper
 
 app = create_app()
 
 
 if __name__ == "__main__":
+    start_session_reaper(app)
     socketio.run(app, host="0.0.0.0", port=5050)
@@ -0,0 +1,31 @@
+"""Persist rendered script HTML keyed by content hash
+
+Revision ID: 7d2a91c4e5b0
+Revises: 3bf1d8e235e4
+Create Date: 2026-10-17 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a91c4e5b0'
+down_revision = '3bf1d8e235e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows keep NULL values and are rendered lazily until their next edit.
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('rendered_html', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('rendered_version', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.drop_column('rendered_version')
+        batch_op.drop_column('rendered_html')
+        batch_op.drop_column('content_hash')
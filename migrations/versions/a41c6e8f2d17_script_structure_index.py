@@ -0,0 +1,34 @@
+"""Store a per-script structure index for durations and cue lookups
+
+Revision ID: a41c6e8f2d17
+Revises: 7d2a91c4e5b0
+Create Date: 2026-10-17 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6e8f2d17'
+down_revision = '7d2a91c4e5b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filling the index needs the app's markup parser: run `flask backfill-scripts`
+    # afterwards so existing rows get word counts and durations.
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('structure_json', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('paragraph_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('word_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('pause_seconds', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.drop_column('pause_seconds')
+        batch_op.drop_column('word_count')
+        batch_op.drop_column('paragraph_count')
+        batch_op.drop_column('structure_json')
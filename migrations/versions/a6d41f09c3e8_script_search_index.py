@@ -0,0 +1,40 @@
+"""Add a full-text search index over scripts
+
+Revision ID: a6d41f09c3e8
+Revises: f3a8c21e6d90
+Create Date: 2026-10-17 15:50:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d41f09c3e8'
+down_revision = 'f3a8c21e6d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The index stores script text with prompter markup stripped, which needs
+    # the app's parser; fill it afterwards with `flask reindex-scripts`.
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE script_search USING fts5(title, body, tokenize = 'porter unicode61')"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE script_search ("
+            "script_id INTEGER PRIMARY KEY REFERENCES scripts (id) ON DELETE CASCADE, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, "
+            "document TSVECTOR GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', body), 'B')"
+            ") STORED)"
+        )
+        op.execute('CREATE INDEX ix_script_search_document ON script_search USING gin (document)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        op.execute('DROP TABLE script_search')
@@ -0,0 +1,31 @@
+"""Expire remote control sessions and index token lookups
+
+Revision ID: b7e3f19a0c52
+Revises: a41c6e8f2d17
+Create Date: 2026-10-17 15:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f19a0c52'
+down_revision = 'a41c6e8f2d17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Active rows without an expiry get one full TTL from the reaper's first run.
+    with op.batch_alter_table('remote_control_sessions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_remote_control_sessions_token_active', ['control_token', 'is_active'], unique=False)
+        batch_op.create_index('ix_remote_control_sessions_active_expires', ['is_active', 'expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('remote_control_sessions', schema=None) as batch_op:
+        batch_op.drop_index('ix_remote_control_sessions_active_expires')
+        batch_op.drop_index('ix_remote_control_sessions_token_active')
+        batch_op.drop_column('expires_at')
@@ -0,0 +1,29 @@
+"""Index organization invites by organization, state and expiry
+
+Revision ID: c8e27d4b1f65
+Revises: a6d41f09c3e8
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e27d4b1f65'
+down_revision = 'a6d41f09c3e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('organization_invites', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_organization_invites_org_active_expires',
+            ['organization_id', 'is_active', 'expires_at'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('organization_invites', schema=None) as batch_op:
+        batch_op.drop_index('ix_organization_invites_org_active_expires')
@@ -0,0 +1,39 @@
+"""Add script excerpts and composite indexes for paginated listings
+
+Revision ID: d2c84a6f9b13
+Revises: b7e3f19a0c52
+Create Date: 2026-10-17 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2c84a6f9b13'
+down_revision = 'b7e3f19a0c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Excerpts are built by the app's markup parser: run `flask backfill-scripts`
+    # afterwards to fill them on existing rows. The composite indexes lead with
+    # the foreign keys, so the single-column ones become redundant.
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=255), nullable=True))
+        batch_op.drop_index('ix_scripts_organization_id')
+        batch_op.drop_index('ix_scripts_owner_id')
+        batch_op.create_index('ix_scripts_org_updated', ['organization_id', 'updated_at'], unique=False)
+        batch_op.create_index(
+            'ix_scripts_owner_org_updated', ['owner_id', 'organization_id', 'updated_at'], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.drop_index('ix_scripts_owner_org_updated')
+        batch_op.drop_index('ix_scripts_org_updated')
+        batch_op.create_index('ix_scripts_owner_id', ['owner_id'], unique=False)
+        batch_op.create_index('ix_scripts_organization_id', ['organization_id'], unique=False)
+        batch_op.drop_column('excerpt')
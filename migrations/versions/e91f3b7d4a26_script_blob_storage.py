@@ -0,0 +1,113 @@
+"""Move script bodies into compressed, content-addressed blobs
+
+Revision ID: e91f3b7d4a26
+Revises: d2c84a6f9b13
+Create Date: 2026-10-17 15:30:00.000000
+
+"""
+from datetime import datetime
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91f3b7d4a26'
+down_revision = 'd2c84a6f9b13'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+scripts = sa.table(
+    'scripts',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.Text()),
+    sa.column('content_hash', sa.String(64)),
+)
+script_blobs = sa.table(
+    'script_blobs',
+    sa.column('digest', sa.String(64)),
+    sa.column('data', sa.LargeBinary()),
+    sa.column('size', sa.Integer()),
+    sa.column('created_at', sa.DateTime()),
+)
+
+
+def upgrade():
+    op.create_table(
+        'script_blobs',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('digest'),
+    )
+
+    connection = op.get_bind()
+    now = datetime.utcnow()
+    stored = set()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(scripts.c.id, scripts.c.content)
+            .where(scripts.c.id > last_id)
+            .order_by(scripts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        blobs = []
+        for row in rows:
+            encoded = (row.content or '').encode('utf-8')
+            digest = hashlib.sha256(encoded).hexdigest()
+            if digest not in stored:
+                stored.add(digest)
+                blobs.append(
+                    {'digest': digest, 'data': zlib.compress(encoded), 'size': len(encoded), 'created_at': now}
+                )
+            connection.execute(scripts.update().where(scripts.c.id == row.id).values(content_hash=digest))
+        if blobs:
+            connection.execute(script_blobs.insert(), blobs)
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index('ix_scripts_content_hash', ['content_hash'], unique=False)
+        batch_op.create_foreign_key('fk_scripts_content_hash_script_blobs', 'script_blobs', ['content_hash'], ['digest'])
+        batch_op.drop_column('content')
+
+
+def downgrade():
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(scripts.c.id, script_blobs.c.data)
+            .join(script_blobs, script_blobs.c.digest == scripts.c.content_hash)
+            .where(scripts.c.id > last_id)
+            .order_by(scripts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            connection.execute(
+                scripts.update()
+                .where(scripts.c.id == row.id)
+                .values(content=zlib.decompress(row.data).decode('utf-8'))
+            )
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('scripts', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_scripts_content_hash_script_blobs', type_='foreignkey')
+        batch_op.drop_index('ix_scripts_content_hash')
+        batch_op.alter_column('content_hash', existing_type=sa.String(length=64), nullable=True)
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+
+    op.drop_table('script_blobs')
@@ -0,0 +1,47 @@
+"""Keep script revision history as snapshots and line deltas
+
+Revision ID: f3a8c21e6d90
+Revises: e91f3b7d4a26
+Create Date: 2026-10-17 15:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c21e6d90'
+down_revision = 'e91f3b7d4a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing scripts start their history with a snapshot on their next edit.
+    op.create_table(
+        'script_revisions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('script_id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.Integer(), nullable=False),
+        sa.Column('base_number', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('blob_digest', sa.String(length=64), nullable=True),
+        sa.Column('delta', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['blob_digest'], ['script_blobs.digest']),
+        sa.ForeignKeyConstraint(['script_id'], ['scripts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('script_id', 'number', name='uq_script_revision_number')
+    )
+    with op.batch_alter_table('script_revisions', schema=None) as batch_op:
+        batch_op.create_index('ix_script_revisions_blob_digest', ['blob_digest'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('script_revisions', schema=None) as batch_op:
+        batch_op.drop_index('ix_script_revisions_blob_digest')
+
+    op.drop_table('script_revisions')
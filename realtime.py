@@ -0,0 +1,32 @@
+"""Production entry-point serving HTTP and the realtime channel on an event loop.
+
+The HTTP blueprints and the ``/control`` Socket.IO namespace share one process
+running on gevent, so each idle prompter or remote connection costs a greenlet
+rather than an OS thread. Run directly, or behind gunicorn with a single
+worker per process::
+
+    python realtime.py
+    gunicorn --worker-class gevent --workers 1 --bind 0.0.0.0:5050 realtime:app
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+
+from app import create_app  # noqa: E402
+from app.extensions import socketio  # noqa: E402
+from app.prompter.reaper import start_session_reaper  # noqa: E402
+
+app = create_app(os.getenv("FLASK_ENV", "production"))
+start_session_reaper(app)
+
+
+if __name__ == "__main__":
+    socketio.run(
+        app,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "5050")),
+    )
@@ -0,0 +1,18 @@
+"""Shared fixtures: a testing app on an in-memory database."""
+from __future__ import annotations
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.drop_all()
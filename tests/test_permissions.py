@@ -0,0 +1,84 @@
+"""Rejected script requests are decided in SQL, without loading the script body."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event, select
+
+from app.extensions import db
+from app.models import OrgMembership, Script, ScriptBlob, User
+from benchmarks.queries import seed, sign_in
+
+MEMBER_EMAIL = "member@example.com"
+MEMBER_PASSWORD = "member-password"
+
+
+@pytest.fixture
+def ids(app):
+    ids = seed(app, organizations=1, scripts=1)
+    with app.app_context():
+        member = User(email=MEMBER_EMAIL, name="Member")
+        member.set_password(MEMBER_PASSWORD)
+        db.session.add(member)
+        db.session.flush()
+        db.session.add(OrgMembership(organization_id=ids["organization"], user_id=member.id, role="member"))
+        ids["shared"] = db.session.scalar(select(Script.id).where(Script.organization_id == ids["organization"]))
+        db.session.commit()
+    return ids
+
+
+@pytest.fixture
+def member(app, ids):
+    client = app.test_client()
+    response = client.post("/auth/login", data={"email": MEMBER_EMAIL, "password": MEMBER_PASSWORD})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def loaded_bodies():
+    """Digests of every script body loaded from the database during the test."""
+    digests: list[str] = []
+
+    def record(target, context):
+        digests.append(target.digest)
+
+    event.listen(ScriptBlob, "load", record)
+    yield digests
+    event.remove(ScriptBlob, "load", record)
+
+
+def test_api_rejects_another_users_script_without_loading_it(member, ids, loaded_bodies):
+    response = member.get(f"/api/scripts/{ids['script']}")
+
+    assert response.status_code == 403
+    assert not loaded_bodies
+
+
+def test_api_reports_a_missing_script_as_not_found(member):
+    response = member.get("/api/scripts/999999")
+
+    assert response.status_code == 404
+
+
+def test_editing_needs_owner_or_admin_without_loading_the_body(member, ids, loaded_bodies):
+    with member.session_transaction() as session:
+        session["active_org_id"] = ids["organization"]
+
+    response = member.get(f"/scripts/{ids['shared']}/edit")
+
+    assert response.status_code == 403
+    assert not loaded_bodies
+
+
+def test_editing_a_script_outside_the_workspace_is_not_found(member, ids, loaded_bodies):
+    response = member.get(f"/scripts/{ids['script']}/edit")
+
+    assert response.status_code == 404
+    assert not loaded_bodies
+
+
+def test_owner_gets_the_script_body(app, ids, loaded_bodies):
+    response = sign_in(app).get(f"/api/scripts/{ids['script']}")
+
+    assert response.status_code == 200
+    assert loaded_bodies
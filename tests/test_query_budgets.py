@@ -0,0 +1,18 @@
+"""Each main page stays within its SQL statement budget from ``benchmarks.queries``."""
+from __future__ import annotations
+
+import pytest
+
+from app.querystats import assert_max_queries
+from benchmarks.queries import BUDGETS, PAGES, open_page, seed, sign_in
+
+
+@pytest.mark.parametrize(("name", "path", "in_organization"), PAGES, ids=[page[0] for page in PAGES])
+def test_page_stays_within_query_budget(app, name, path, in_organization):
+    ids = seed(app)
+    client = sign_in(app)
+
+    with assert_max_queries(BUDGETS[name]):
+        response = open_page(client, ids, path, in_organization)
+
+    assert response.status_code == 200
@@ -0,0 +1,70 @@
+"""Statement counting, the slow-query log and the query headers, through the test client."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from app.querystats import assert_max_queries, count_queries
+from benchmarks.queries import seed, sign_in
+
+
+@pytest.fixture
+def client(app):
+    seed(app, organizations=1, scripts=2)
+    return sign_in(app)
+
+
+def test_assert_max_queries_lists_statements_over_the_limit(client):
+    with pytest.raises(AssertionError) as excinfo:
+        with assert_max_queries(0):
+            client.get("/settings")
+
+    message = str(excinfo.value)
+    assert "expected at most 0" in message
+    assert "SELECT" in message
+
+
+def test_assert_max_queries_passes_within_the_limit(client):
+    with assert_max_queries(10) as stats:
+        response = client.get("/settings")
+
+    assert response.status_code == 200
+    assert 0 < stats.count <= 10
+
+
+def test_slow_queries_are_logged_with_their_route(app, client, caplog):
+    app.config["SQL_SLOW_QUERY_SECONDS"] = 1e-9
+
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        client.get("/settings")
+
+    slow = [record.getMessage() for record in caplog.records if record.msg.startswith("Slow query")]
+    assert slow
+    assert all(message.startswith("Slow query in GET /settings") for message in slow)
+
+
+def test_slow_query_log_is_off_at_zero(app, client, caplog):
+    app.config["SQL_SLOW_QUERY_SECONDS"] = 0
+
+    with caplog.at_level(logging.WARNING, logger=app.logger.name):
+        client.get("/settings")
+
+    assert not [record for record in caplog.records if record.msg.startswith("Slow query")]
+
+
+def test_query_headers_report_the_request_totals(app, client):
+    app.config["SQL_QUERY_HEADERS"] = True
+
+    with count_queries() as stats:
+        response = client.get("/settings")
+
+    assert response.headers["X-Query-Count"] == str(stats.count)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert f'desc="{stats.count} queries"' in response.headers["Server-Timing"]
+
+
+def test_query_headers_are_off_by_default(client):
+    response = client.get("/settings")
+
+    assert "X-Query-Count" not in response.headers
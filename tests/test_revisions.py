@@ -0,0 +1,123 @@
+"""Script revision history: deltas, snapshots and the revisions API."""
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Script, ScriptRevision
+from app.revisions import apply_delta, encode_delta, revision_text
+from benchmarks.queries import seed, sign_in
+
+TEXTS = [
+    "",
+    "One line",
+    "One line\n",
+    "First\nSecond\nThird",
+    "First\r\nSecond\r\nThird\r\n",
+    "Mixed\r\nendings\nand\rseparators\u2028here\x0c",
+    "\n\n\n",
+]
+
+
+@pytest.fixture
+def ids(app):
+    return seed(app, organizations=1, scripts=1)
+
+
+@pytest.fixture
+def client(app, ids):
+    return sign_in(app)
+
+
+def _save(client, script_id: int, text: str) -> None:
+    response = client.patch(f"/api/scripts/{script_id}", json={"content": text})
+    assert response.status_code == 200
+
+
+def test_diff_marks_a_final_line_without_newline(client, ids):
+    _save(client, ids["script"], "Intro\nedit 1")
+    _save(client, ids["script"], "Intro\nedit 2")
+
+    response = client.get(f"/api/scripts/{ids['script']}/revisions/3/diff")
+
+    assert response.status_code == 200
+    assert response.get_json()["diff"].splitlines()[3:] == [
+        " Intro",
+        "-edit 1",
+        "\\ No newline at end of file",
+        "+edit 2",
+        "\\ No newline at end of file",
+    ]
+
+
+def test_diff_marks_a_newline_added_at_the_end(client, ids):
+    _save(client, ids["script"], "Intro\nlast")
+    _save(client, ids["script"], "Intro\nlast\n")
+
+    diff = client.get(f"/api/scripts/{ids['script']}/revisions/3/diff").get_json()["diff"]
+
+    assert diff.splitlines()[3:] == [" Intro", "-last", "\\ No newline at end of file", "+last"]
+
+
+def test_listing_before_zero_returns_no_revisions(client, ids):
+    _save(client, ids["script"], "Second draft")
+
+    listing = client.get(f"/api/scripts/{ids['script']}/revisions?before=0").get_json()
+
+    assert listing["revisions"] == []
+    assert listing["next_before"] is None
+
+
+def test_listing_pages_back_from_before(client, ids):
+    for index in range(3):
+        _save(client, ids["script"], f"Draft {index}")
+
+    listing = client.get(f"/api/scripts/{ids['script']}/revisions?before=3").get_json()
+
+    assert [revision["number"] for revision in listing["revisions"]] == [2, 1]
+
+
+@pytest.mark.parametrize("old", TEXTS)
+@pytest.mark.parametrize("new", TEXTS + ["First\nInserted\nThird", "Third\nSecond\nFirst\n"])
+def test_delta_round_trip(old, new):
+    assert apply_delta(old, encode_delta(old, new)) == new
+
+
+def _revisions(app, script_id: int) -> list[ScriptRevision]:
+    with app.app_context():
+        return db.session.scalars(
+            select(ScriptRevision).where(ScriptRevision.script_id == script_id).order_by(ScriptRevision.number)
+        ).all()
+
+
+def test_delta_chains_stay_shorter_than_the_snapshot_interval(app, client, ids):
+    app.config["SCRIPT_SNAPSHOT_EVERY"] = 4
+    texts = [f"Intro\nDraft {index}\n" + "Body\n" * index for index in range(10)]
+    for text in texts:
+        _save(client, ids["script"], text)
+
+    revisions = _revisions(app, ids["script"])
+    assert [revision.number for revision in revisions] == list(range(1, 12))
+    assert all(revision.number - revision.base_number < 4 for revision in revisions)
+    snapshots = [revision.number for revision in revisions if revision.number == revision.base_number]
+    assert snapshots == [1, 5, 9]
+    with app.app_context():
+        assert [revision_text(ids["script"], number) for number in range(2, 12)] == texts
+
+
+def test_out_of_band_edit_restarts_history_from_a_snapshot(app, client, ids):
+    _save(client, ids["script"], "Saved through the app\n")
+    with app.app_context():
+        db.session.get(Script, ids["script"]).content = "Edited behind its back\n"
+        db.session.commit()
+
+    _save(client, ids["script"], "Saved again\n")
+
+    revisions = _revisions(app, ids["script"])
+    assert [(revision.number, revision.base_number) for revision in revisions] == [(1, 1), (2, 1), (3, 3), (4, 3)]
+    assert revisions[2].author_id is None
+    with app.app_context():
+        assert revision_text(ids["script"], 2) == "Saved through the app\n"
+        assert revision_text(ids["script"], 3) == "Edited behind its back\n"
+        assert revision_text(ids["script"], 4) == "Saved again\n"